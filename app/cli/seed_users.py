@@ -0,0 +1,201 @@
+"""
+Bulk-load synthetic users, e.g. for load testing ``GET /users/`` or login.
+
+Usage:
+    python -m app.cli.seed_users --count 1000000 --seed 42
+
+User ``i`` of a seed always gets the same email, name and password, so runs
+are reproducible and load generators can compute valid credentials:
+its password is ``password_for(i, distinct_passwords)``. Only a few distinct
+Argon2 hashes are computed up front and shared between users. Rows are
+loaded with ``COPY`` on PostgreSQL and batched multi-row INSERTs elsewhere,
+on the owning shard in sharded mode. Each batch is committed on its own;
+re-running the same command resumes after the users already loaded.
+
+Seeded users bypass the service layer: no change log entries or events
+are written for them.
+"""
+import argparse
+import csv
+import io
+import sys
+import time
+from typing import Callable
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from app.core import database
+from app.core.database import dialect_insert
+from app.core.schema import upgrade_schema
+from app.core.security import get_password_hash
+from app.models.user_model import User
+
+FIRST_NAMES = (
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Maria",
+    "Daniel", "Karen", "Ahmed", "Fatima", "Wei", "Mei", "Hiroshi", "Yuki", "Ivan", "Olga",
+    "Luca", "Giulia", "Lukas", "Anna", "Mateo", "Sofia", "Arjun", "Priya", "Kwame", "Amara",
+)
+LAST_NAMES = (
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Martin", "Lee", "Walker",
+    "Khan", "Ali", "Wang", "Li", "Zhang", "Tanaka", "Sato", "Ivanov", "Petrova", "Rossi",
+    "Bianchi", "Muller", "Schmidt", "Silva", "Santos", "Patel", "Sharma", "Mensah", "Okafor", "Nguyen",
+)
+PROVIDERS = ("example.com", "example.org", "example.net")
+
+_MASK64 = (1 << 64) - 1
+_COPY_COLUMNS = ("email", "hashed_password", "full_name")
+
+
+def _mix(seed: int, index: int) -> int:
+    """SplitMix64 of (seed, index): a cheap, platform-independent pseudo-random 64-bit value."""
+    x = (seed * 0x9E3779B97F4A7C15 + index) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def email_domain(seed: int, provider: str) -> str:
+    """Domain of the seeded users of a seed; it marks them, so a run can resume."""
+    return f"seed{seed}.{provider}"
+
+
+def password_for(index: int, distinct_passwords: int) -> str:
+    """Return the plain password of seeded user ``index``."""
+    return f"seed-password-{index % distinct_passwords}"
+
+
+def synthetic_user(seed: int, index: int) -> tuple[str, str]:
+    """
+    Return the email and full name of seeded user ``index``.
+
+    The index is part of the email, so emails are unique within a seed.
+    """
+    x = _mix(seed, index)
+    first = FIRST_NAMES[x % len(FIRST_NAMES)]
+    last = LAST_NAMES[(x >> 16) % len(LAST_NAMES)]
+    provider = PROVIDERS[(x >> 32) % len(PROVIDERS)]
+    return f"{first.lower()}.{last.lower()}.{index}@{email_domain(seed, provider)}", f"{first} {last}"
+
+
+def count_seeded(engines: dict[str, Engine], seed: int) -> int:
+    """Count the users of a seed already loaded, over all shards."""
+    statement = select(func.count()).select_from(User).where(User.email.like(f"%@seed{seed}.%"))
+    total = 0
+    for shard_engine in engines.values():
+        with shard_engine.connect() as connection:
+            total += connection.execute(statement).scalar_one()
+    return total
+
+
+def _copy_rows(engine: Engine, rows: list[dict]) -> None:
+    """Load rows with PostgreSQL ``COPY ... FROM STDIN``, in one transaction."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in _COPY_COLUMNS])
+    buffer.seek(0)
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY users ({', '.join(_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def _insert_rows(engine: Engine, rows: list[dict]) -> None:
+    """Insert rows in one transaction, skipping emails that already exist."""
+    statement = dialect_insert(User.__table__).on_conflict_do_nothing(index_elements=["email"])
+    with engine.begin() as connection:
+        connection.execute(statement, rows)
+
+
+def seed_users(
+    engines: dict[str, Engine],
+    shard_for: Callable[[str], str | None],
+    count: int,
+    seed: int = 0,
+    batch_size: int = 10000,
+    distinct_passwords: int = 16,
+    progress: Callable[[int, int, float], None] | None = None,
+) -> int:
+    """
+    Load seeded users ``0`` to ``count - 1`` of a seed, resuming after those already loaded.
+
+    Args:
+        engines (dict[str, Engine]): Engines by shard ID.
+        shard_for (Callable): Returns the shard ID owning an email, or None when there is a single engine.
+        count (int): Total number of seeded users wanted.
+        seed (int): Seed selecting the users.
+        batch_size (int): Users per committed batch; resume with the same value.
+        distinct_passwords (int): Distinct passwords (and Argon2 hashes) shared by the users.
+        progress (Callable, optional): Called after each batch with (users loaded, count, rows/sec of this run).
+
+    Returns:
+        int: Number of users loaded by this run.
+    """
+    # Every batch is committed on each shard independently, so only the last one can be partial:
+    # restart at its beginning and skip the rows that made it.
+    start = min(count_seeded(engines, seed) // batch_size * batch_size, count)
+    hashes = [get_password_hash(password_for(index, distinct_passwords)) for index in range(min(distinct_passwords, count))]
+    default_engine = next(iter(engines.values()))
+    started = time.perf_counter()
+    for batch_start in range(start, count, batch_size):
+        rows_by_shard: dict[str | None, list[dict]] = {}
+        for index in range(batch_start, min(batch_start + batch_size, count)):
+            email, full_name = synthetic_user(seed, index)
+            rows_by_shard.setdefault(shard_for(email), []).append(
+                {"email": email, "hashed_password": hashes[index % distinct_passwords], "full_name": full_name}
+            )
+        for shard_id, rows in rows_by_shard.items():
+            shard_engine = default_engine if shard_id is None else engines[shard_id]
+            if shard_engine.dialect.name == "postgresql" and batch_start != start:
+                _copy_rows(shard_engine, rows)
+            else:
+                _insert_rows(shard_engine, rows)
+        if progress is not None:
+            loaded = min(batch_start + batch_size, count)
+            progress(loaded, count, (loaded - start) / max(time.perf_counter() - started, 1e-9))
+    return max(count - start, 0)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic users for load testing and staging.")
+    parser.add_argument("--count", type=int, required=True, help="total number of seeded users wanted")
+    parser.add_argument("--seed", type=int, default=0, help="seed selecting the users (default: 0)")
+    parser.add_argument("--batch-size", type=int, default=10000, help="users per committed batch (default: 10000)")
+    parser.add_argument("--distinct-passwords", type=int, default=16, help="distinct passwords shared by the users (default: 16)")
+    args = parser.parse_args(argv)
+    if args.count < 0 or args.batch_size < 1 or args.distinct_passwords < 1:
+        parser.error("--count must be >= 0, --batch-size and --distinct-passwords >= 1")
+
+    for shard_engine in database.engines.values():
+        # Statement logging would dominate the load time
+        shard_engine.echo = False
+        upgrade_schema(shard_engine)
+
+    def report(loaded: int, count: int, rate: float) -> None:
+        print(f"\r{loaded:,}/{count:,} users ({loaded / count:.1%}), {rate:,.0f} rows/s", end="", file=sys.stderr, flush=True)
+
+    started = time.perf_counter()
+    loaded = seed_users(
+        database.engines,
+        database.shard_for,
+        count=args.count,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        distinct_passwords=args.distinct_passwords,
+        progress=report,
+    )
+    elapsed = time.perf_counter() - started
+    print(file=sys.stderr)
+    print(
+        f"Loaded {loaded:,} users in {elapsed:.1f}s. "
+        f"Passwords: user i has 'seed-password-<i % {args.distinct_passwords}>'.",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
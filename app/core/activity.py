@@ -0,0 +1,159 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from sqlalchemy import DateTime, bindparam, func, update
+from app.core.config import activity_settings
+from app.core.database import SessionLocal
+from app.models.user_model import User
+
+logger = logging.getLogger(__name__)
+
+users = User.__table__
+
+# One executemany for all pending users; last_login_at is only overwritten for users who logged in
+_FLUSH_STATEMENT = (
+    update(users)
+    .where(users.c.id == bindparam("user_id"))
+    .values(
+        last_seen_at=bindparam("last_seen", type_=DateTime(timezone=True)),
+        last_login_at=func.coalesce(bindparam("last_login", type_=DateTime(timezone=True)), users.c.last_login_at),
+    )
+)
+
+
+class ActivityTracker:
+    """
+    In-memory accumulator for user last-seen / last-login timestamps.
+
+    Authenticated requests record activity here instead of writing to the
+    database. Pending timestamps are flushed periodically by a background
+    thread as one batched UPDATE, and a user's last-seen timestamp is written
+    at most once per ``write_interval`` seconds. Logins always go through the
+    same path and are written on the next flush. In sharded mode users are
+    tracked per shard (IDs are unique per shard only) and each shard gets its
+    own batched UPDATE.
+
+    Args:
+        session_factory: Callable returning a new SQLAlchemy session.
+        flush_interval (float): Seconds between background flushes.
+        write_interval (float): Minimum seconds between last-seen writes for the same user.
+    """
+
+    def __init__(self, session_factory, flush_interval: float, write_interval: float):
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.write_interval = write_interval
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[str | None, int], dict] = {}
+        self._last_written: dict[tuple[str | None, int], float] = {}
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def record_seen(self, user_id: int, shard_id: str | None = None) -> None:
+        """
+        Record that a user made an authenticated request.
+
+        Args:
+            user_id (int): ID of the user.
+            shard_id (str | None): Shard of the user, None when sharding is off.
+        """
+        key = (shard_id, user_id)
+        last_written = self._last_written.get(key)
+        if last_written is not None and time.monotonic() - last_written < self.write_interval:
+            return
+        seen_at = datetime.now(timezone.utc)
+        with self._lock:
+            entry = self._pending.setdefault(key, {"user_id": user_id, "last_login": None})
+            entry["last_seen"] = seen_at
+
+    def record_login(self, user_id: int, shard_id: str | None = None) -> None:
+        """
+        Record a successful login. Also counts as the user being seen.
+
+        Args:
+            user_id (int): ID of the user.
+            shard_id (str | None): Shard of the user, None when sharding is off.
+        """
+        logged_in_at = datetime.now(timezone.utc)
+        with self._lock:
+            entry = self._pending.setdefault((shard_id, user_id), {"user_id": user_id})
+            entry["last_login"] = logged_in_at
+            entry["last_seen"] = logged_in_at
+
+    def pending_count(self) -> int:
+        """Return the number of users with unflushed activity."""
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write all pending activity to the database as one batched UPDATE per shard.
+
+        Returns:
+            int: Number of users written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        rows_by_shard: dict[str | None, list[dict]] = {}
+        for (shard_id, _), entry in pending.items():
+            rows_by_shard.setdefault(shard_id, []).append(entry)
+        try:
+            with self._session_factory() as db:
+                for shard_id, rows in rows_by_shard.items():
+                    db.execute(_FLUSH_STATEMENT, rows, bind_arguments={"shard_id": shard_id})
+                db.commit()
+        except Exception:
+            # Put the rows back so the next flush retries them; newer values win.
+            with self._lock:
+                for key, entry in pending.items():
+                    newer = self._pending.get(key, {})
+                    self._pending[key] = {**entry, **newer, "last_login": newer.get("last_login") or entry["last_login"]}
+            raise
+
+        now = time.monotonic()
+        with self._lock:
+            for key in pending:
+                self._last_written[key] = now
+            self._last_written = {
+                key: written_at
+                for key, written_at in self._last_written.items()
+                if now - written_at < self.write_interval
+            }
+        return len(pending)
+
+    def start(self) -> None:
+        """Start the background flush thread."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="activity-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background flush thread and flush anything still pending."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Final activity flush failed")
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Activity flush failed")
+
+
+activity_tracker = ActivityTracker(
+    session_factory=SessionLocal,
+    flush_interval=activity_settings.activity_flush_interval_seconds,
+    write_interval=activity_settings.activity_write_interval_seconds,
+)
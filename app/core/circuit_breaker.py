@@ -0,0 +1,139 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of connecting to a database whose circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Database circuit breaker is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one database.
+
+    After ``failure_threshold`` consecutive connection failures the circuit
+    opens and connection checkouts fail immediately instead of waiting for
+    the connect timeout. After ``reset_timeout`` seconds it turns half-open
+    and admits up to ``half_open_max_calls`` checkouts as probes: a success
+    closes the circuit, a failure opens it again. Probes that never report
+    back are given up after another ``reset_timeout``.
+
+    Args:
+        failure_threshold (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Seconds the circuit stays open before probing.
+        half_open_max_calls (int): Probe checkouts admitted per half-open period.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, half_open_max_calls: int):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._changed_at = time.monotonic()
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._advance(time.monotonic())
+            return self._state
+
+    def allow(self) -> bool:
+        """Return whether a connection may be checked out; in half-open state this takes a probe slot."""
+        if self._state == CLOSED:
+            return True
+        with self._lock:
+            self._advance(time.monotonic())
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit will next admit a probe."""
+        with self._lock:
+            return max(self._changed_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def record_success(self) -> None:
+        if self._state == CLOSED and self._failures == 0:
+            return
+        with self._lock:
+            self._set_state(CLOSED, time.monotonic())
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._set_state(OPEN, now)
+
+    def snapshot(self) -> dict:
+        """Return the breaker state for the readiness report."""
+        with self._lock:
+            self._advance(time.monotonic())
+            return {"state": self._state, "consecutive_failures": self._failures}
+
+    def _advance(self, now: float) -> None:
+        if now - self._changed_at < self.reset_timeout:
+            return
+        if self._state == OPEN:
+            self._set_state(HALF_OPEN, now)
+        elif self._state == HALF_OPEN:
+            # Probes never reported back: start a new half-open period
+            self._set_state(HALF_OPEN, now)
+
+    def _set_state(self, state: str, now: float) -> None:
+        if state == CLOSED:
+            self._failures = 0
+        self._state = state
+        self._changed_at = now
+        self._probes = 0
+
+
+def attach_circuit_breaker(engine: Engine, breaker: CircuitBreaker) -> CircuitBreaker:
+    """
+    Guard an engine's connection checkout and query execution with a breaker.
+
+    While the circuit is open every checkout is refused; while it is half-open
+    every checkout, of a new or a pooled connection, takes a probe slot.
+    Checkouts are refused before they reach the pool: a pool ``checkout``
+    listener that raises would invalidate the healthy pooled connection,
+    and closing the circuit would then reconnect the whole pool at once.
+    Failures are connect errors and lost connections only: query errors such
+    as statement or lock timeouts mean the database is up. Any completed
+    statement counts as a success.
+    """
+    # Every Connection, including one reconnecting after an invalidation, checks out through here
+    pool_checkout = engine.raw_connection
+
+    def guarded_checkout():
+        if not breaker.allow():
+            raise CircuitOpenError(breaker.retry_after())
+        return pool_checkout()
+
+    engine.raw_connection = guarded_checkout
+
+    @event.listens_for(engine, "handle_error")
+    def _record_failure(exception_context):
+        # No connection means the error was raised while connecting
+        if exception_context.is_disconnect or exception_context.connection is None:
+            breaker.record_failure()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record_success(conn, cursor, statement, parameters, context, executemany):
+        breaker.record_success()
+
+    return breaker
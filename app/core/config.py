@@ -1,3 +1,4 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings
 
 class AppSettings(BaseSettings):
@@ -14,6 +15,9 @@ class JWTSettings(BaseSettings):
     algorithm: str
     access_token_expire_minutes: int
     refresh_token_expire_days: int
+    stateless_auth: bool = False
+    token_version_cache_seconds: float = 30.0
+    token_version_cache_size: int = 100000
 
     class Config:
         env_file = ".env"
@@ -25,6 +29,115 @@ class DBSettings(BaseSettings):
     postgres_db: str
     postgres_host: str
     postgres_port: int
+    database_url: str | None = None
+    db_echo: bool = True
+    # Non-empty enables sharded mode: users are partitioned by email across these databases
+    shard_urls: list[str] = []
+    # Scatter-gather calls that can query all shards at the same time; more wait for a free worker
+    shard_gather_concurrency: int = 10
+
+    class Config:
+        env_file = ".env"
+        extra="ignore"
+
+class PasswordHashSettings(BaseSettings):
+    argon2_time_cost: int = 2
+    argon2_memory_cost: int = 102400
+    argon2_parallelism: int = 8
+
+    class Config:
+        env_file = ".env"
+        extra="ignore"
+
+class ActivitySettings(BaseSettings):
+    activity_flush_interval_seconds: float = 30.0
+    activity_write_interval_seconds: float = 300.0
+
+    class Config:
+        env_file = ".env"
+        extra="ignore"
+
+class HealthSettings(BaseSettings):
+    readiness_cache_seconds: float = 2.0
+    readiness_pool_saturation_threshold: float = 0.9
+    readiness_max_activity_backlog: int = 100000
+
+    class Config:
+        env_file = ".env"
+        extra="ignore"
+
+class SingleFlightSettings(BaseSettings):
+    user_lookup_timeout_seconds: float = 5.0
+
+    class Config:
+        env_file = ".env"
+        extra="ignore"
+
+class ProfilingSettings(BaseSettings):
+    profiling_secret: str = ""
+    profiling_sample_rate: float = 0.0
+    profiling_sample_interval_seconds: float = 0.005
+    profiling_trace_memory: bool = False
+    profiling_dir: str = "profiles"
+    # At least one, as the ring always keeps the newest profile
+    profiling_max_profiles: int = Field(default=50, ge=1)
+
+    class Config:
+        env_file = ".env"
+        extra="ignore"
+
+class LoadSheddingSettings(BaseSettings):
+    load_shedding_max_in_flight: int = 64
+    load_shedding_max_queue: int = 256
+    load_shedding_queue_timeout_seconds: float = 2.0
+    load_shedding_route_limits: dict[str, int] = {
+        "POST /auth/register": 8,
+        "GET /users/": 4,
+    }
+    load_shedding_route_priorities: dict[str, int] = {
+        "POST /auth/refresh": 0,
+        "GET /users/me": 0,
+        "POST /auth/login": 1,
+        "POST /auth/register": 3,
+        "GET /users/": 3,
+    }
+
+    class Config:
+        env_file = ".env"
+        extra="ignore"
+
+class EventSettings(BaseSettings):
+    events_subscriber_buffer: int = 100
+    events_heartbeat_seconds: float = 15.0
+
+    class Config:
+        env_file = ".env"
+        extra="ignore"
+
+class TracingSettings(BaseSettings):
+    tracing_sample_rate: float = 0.0
+    tracing_exporter: str = "file"  # "file" or "memory"
+    tracing_file: str = "traces/spans.jsonl"
+    tracing_service_name: str = "fastapi-backend"
+
+    class Config:
+        env_file = ".env"
+        extra="ignore"
+
+class IdempotencySettings(BaseSettings):
+    idempotency_store: str = "memory"  # "memory" or "database"
+    idempotency_ttl_seconds: float = 86400.0
+    idempotency_max_entries: int = 10000
+    idempotency_wait_timeout_seconds: float = 30.0
+
+    class Config:
+        env_file = ".env"
+        extra="ignore"
+
+class CircuitBreakerSettings(BaseSettings):
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout_seconds: float = 10.0
+    circuit_half_open_max_calls: int = 1
 
     class Config:
         env_file = ".env"
@@ -33,3 +146,13 @@ class DBSettings(BaseSettings):
 app_settings = AppSettings()
 jwt_settings = JWTSettings()
 db_settings = DBSettings()
+password_hash_settings = PasswordHashSettings()
+activity_settings = ActivitySettings()
+health_settings = HealthSettings()
+singleflight_settings = SingleFlightSettings()
+profiling_settings = ProfilingSettings()
+load_shedding_settings = LoadSheddingSettings()
+event_settings = EventSettings()
+tracing_settings = TracingSettings()
+idempotency_settings = IdempotencySettings()
+circuit_breaker_settings = CircuitBreakerSettings()
@@ -1,28 +1,248 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from app.core.config import DBSettings
+import contextvars
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, TypeVar
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+from app.core.circuit_breaker import CircuitBreaker, attach_circuit_breaker
+from app.core.config import DBSettings, circuit_breaker_settings
+
+T = TypeVar("T")
 
 # Load DB settings
 db_settings = DBSettings()
 
-# PostgreSQL URL
-DATABASE_URL = (
+# PostgreSQL URL, unless DATABASE_URL overrides it (e.g. SQLite for tests)
+DATABASE_URL = db_settings.database_url or (
     f"postgresql://{db_settings.postgres_user}:{db_settings.postgres_password}"
     f"@{db_settings.postgres_host}:{db_settings.postgres_port}/{db_settings.postgres_db}"
 )
 
-# Create engine
-engine = create_engine(DATABASE_URL, echo=True, future=True)
+def _engine_options(url: str) -> dict:
+    """Engine options for a database URL; SQLite connections are shared across threads."""
+    options = {"echo": db_settings.db_echo, "future": True}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+        if url in ("sqlite://", "sqlite:///:memory:"):
+            # One connection, so every session sees the same in-memory database
+            options["poolclass"] = StaticPool
+    return options
+
+def _use_explicit_sqlite_transactions(sqlite_engine) -> None:
+    """
+    Let SQLAlchemy emit BEGIN itself instead of pysqlite, which otherwise breaks SAVEPOINTs.
+
+    See "Serializable isolation / Savepoints / Transactional DDL" in the SQLAlchemy SQLite docs.
+    """
+    @event.listens_for(sqlite_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(sqlite_engine, "begin")
+    def _emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+def make_engine(url: str) -> Engine:
+    """Create an engine for a database URL with the app's options."""
+    new_engine = create_engine(url, **_engine_options(url))
+    if new_engine.dialect.name == "sqlite":
+        _use_explicit_sqlite_transactions(new_engine)
+    return new_engine
+
+
+def _emails_in_criteria(statement) -> set[str] | None:
+    """
+    Return the emails a statement is restricted to by a top-level ``email == x`` or ``email IN (...)``
+    condition, or None if it is not restricted by email.
+    """
+    for criterion in getattr(statement, "_where_criteria", ()):
+        if not isinstance(criterion, BinaryExpression) or getattr(criterion.left, "key", None) != "email":
+            continue
+        if not isinstance(criterion.right, BindParameter):
+            continue
+        value = criterion.right.effective_value
+        if criterion.operator is operators.eq and isinstance(value, str):
+            return {value}
+        if criterion.operator is operators.in_op and isinstance(value, (list, tuple)):
+            return set(value)
+    return None
+
+
+class ShardRouter:
+    """
+    Routes users to one of several databases by a stable hash of their email.
+
+    Every shard holds the full schema; a user and its change log live on the
+    user's shard, so each write touches exactly one database. Statements
+    restricted by email go to the owning shard(s) only; anything else is run
+    on every shard and the results are concatenated. User IDs are unique per
+    shard only; email is the global key.
+
+    Args:
+        engines (dict[str, Engine]): Engines by shard ID, in shard order.
+        gather_concurrency (int): Concurrent scatter-gather calls served without queueing;
+            the shared worker pool has one thread per shard for each.
+    """
+
+    def __init__(self, engines: dict[str, Engine], gather_concurrency: int = 10):
+        self.engines = engines
+        self.shard_ids = list(engines)
+        self._shard_sessions = {
+            shard_id: sessionmaker(autoflush=False, expire_on_commit=False, bind=shard_engine)
+            for shard_id, shard_engine in engines.items()
+        }
+        self._executor = ThreadPoolExecutor(max_workers=len(engines) * gather_concurrency, thread_name_prefix="shard-scatter")
+
+    def shard_for(self, email: str) -> str:
+        """Return the ID of the shard owning an email. Stable across processes and restarts."""
+        return self.shard_ids[zlib.crc32(email.lower().encode()) % len(self.shard_ids)]
+
+    def session_factory(self, **kwargs) -> sessionmaker:
+        """Return a sessionmaker for sessions spanning all shards."""
+        return sessionmaker(
+            class_=ShardedSession,
+            shards=self.engines,
+            shard_chooser=self._shard_chooser,
+            identity_chooser=self._identity_chooser,
+            execute_chooser=self._execute_chooser,
+            **kwargs,
+        )
+
+    def scatter_gather(self, fn: Callable[[Session, str], T], shard_ids: Iterable[str] | None = None) -> list[T]:
+        """
+        Run ``fn(session, shard_id)`` on the given shards (default: all) in parallel.
+
+        Returns:
+            list: Results in shard order.
+        """
+        def run(shard_id: str) -> T:
+            with self._shard_sessions[shard_id]() as session:
+                return fn(session, shard_id)
+
+        # Each worker runs in a copy of the caller's context, so tracing spans nest under the caller's
+        futures = [
+            self._executor.submit(contextvars.copy_context().run, run, shard_id)
+            for shard_id in (self.shard_ids if shard_ids is None else shard_ids)
+        ]
+        return [future.result() for future in futures]
+
+    def _shard_chooser(self, mapper, instance, clause=None, **kwargs) -> str:
+        email = getattr(instance, "email", None)
+        if email is None:
+            raise ValueError(f"Cannot choose a shard for {instance!r} without an email")
+        return self.shard_for(email)
 
-# SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def _identity_chooser(self, mapper, primary_key, *, lazy_loaded_from, execution_options, bind_arguments, **kwargs) -> list[str]:
+        if lazy_loaded_from is not None:
+            return [lazy_loaded_from.identity_token]
+        if bind_arguments.get("shard_id") is not None:
+            return [bind_arguments["shard_id"]]
+        return self.shard_ids
+
+    def _execute_chooser(self, orm_context) -> list[str]:
+        emails = _emails_in_criteria(orm_context.statement)
+        if emails is None:
+            return self.shard_ids
+        return sorted({self.shard_for(email) for email in emails}, key=self.shard_ids.index)
+
+
+# Create engines; with SHARD_URLS set, one per shard and the first one doubles as the primary engine
+if db_settings.shard_urls:
+    engines = {str(index): make_engine(url) for index, url in enumerate(db_settings.shard_urls)}
+    shard_router = ShardRouter(engines, gather_concurrency=db_settings.shard_gather_concurrency)
+else:
+    engines = {"default": make_engine(DATABASE_URL)}
+    shard_router = None
+engine = next(iter(engines.values()))
+
+# One circuit breaker per database, so an outage of one shard does not fail the others
+circuit_breakers = {
+    shard_id: attach_circuit_breaker(shard_engine, CircuitBreaker(
+        failure_threshold=circuit_breaker_settings.circuit_failure_threshold,
+        reset_timeout=circuit_breaker_settings.circuit_reset_timeout_seconds,
+        half_open_max_calls=circuit_breaker_settings.circuit_half_open_max_calls,
+    ))
+    for shard_id, shard_engine in engines.items()
+}
+
+# SessionLocal class; objects stay loaded after commit so write paths need no refresh SELECT
+_session_options = {"autocommit": False, "autoflush": False, "expire_on_commit": False}
+if shard_router is not None:
+    SessionLocal = shard_router.session_factory(**_session_options)
+else:
+    SessionLocal = sessionmaker(bind=engine, **_session_options)
+
+def shard_for(email: str) -> str | None:
+    """Return the ID of the shard owning an email, or None when sharding is off."""
+    return shard_router.shard_for(email) if shard_router is not None else None
+
+def all_shard_ids() -> list[str | None]:
+    """Return all shard IDs in shard order; ``[None]`` when sharding is off."""
+    return shard_router.shard_ids if shard_router is not None else [None]
+
+def scatter_gather(db: Session, fn: Callable[[Session, str | None], T], shard_ids: Iterable[str | None] | None = None) -> list[T]:
+    """
+    Run ``fn(session, shard_id)`` on every shard in parallel, each with its own session.
+
+    When sharding is off, this is just ``[fn(db, None)]`` on the request's session.
+    """
+    if shard_router is None:
+        return [fn(db, None)]
+    return shard_router.scatter_gather(fn, shard_ids)
+
+# Dialect-specific INSERT, supporting ON CONFLICT ... DO NOTHING
+if engine.dialect.name == "sqlite":
+    from sqlalchemy.dialects.sqlite import insert as dialect_insert
+else:
+    from sqlalchemy.dialects.postgresql import insert as dialect_insert
 
 # Base class for models
 Base = declarative_base()
 
+class LazySession:
+    """
+    Stand-in for a Session that only creates it on first use.
+
+    Requests that never query, such as those with an invalid token, or in
+    stateless mode those with a cached token version whose handler needs
+    no database (a forbidden admin route, the profile downloads), never
+    build a session. Everything else is delegated to the real session.
+    """
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, factory: Callable[[], Session]):
+        self._factory = factory
+        self._session: Session | None = None
+
+    def __getattr__(self, name: str):
+        if self._session is None:
+            self._session = self._factory()
+        return getattr(self._session, name)
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+
+def release_connection(db: Session) -> None:
+    """
+    Give the session's connection back to the pool once a request is done reading.
+
+    Call it before slow non-database work or response serialization, so a
+    request holds a connection only while it runs SQL. The session's
+    transaction is ended and its objects are detached with their loaded
+    attributes intact; a later query checks out a connection again.
+    Never commits: use it only when there is nothing to write.
+    """
+    db.close()
+
 # Dependency for FastAPI routes
 def get_db():
-    db = SessionLocal()
+    db = LazySession(SessionLocal)
     try:
         yield db
     finally:
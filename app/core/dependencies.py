@@ -1,26 +1,91 @@
+import functools
+import operator
+from typing import Callable
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.core.database import get_db, release_connection, shard_for
 from app.models.user_model import User
 from app.core.security import verify_token
+from app.core.activity import activity_tracker
+from app.core.config import jwt_settings, singleflight_settings
+from app.core.singleflight import SingleFlight
+from app.core.token_versions import token_versions
+from app.core.permissions import ROLE_PERMISSIONS, Permission, permissions_for_role
 
 # OAuth2 scheme to extract token from Authorization header
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+# Concurrent lookups of the same user share one query
+user_lookups = SingleFlight(timeout=singleflight_settings.user_lookup_timeout_seconds)
+
+class Principal:
+    """
+    Authenticated user built from access token claims, without a database query.
+
+    Used in place of a User when STATELESS_AUTH is enabled.
+    """
+    __slots__ = ("id", "email", "full_name", "role", "token_version", "permissions")
+
+    def __init__(self, id: int, email: str, full_name: str | None, role: str, token_version: int):
+        self.id = id
+        self.email = email
+        self.full_name = full_name
+        self.role = role
+        self.token_version = token_version
+        self.permissions = permissions_for_role(role)
+
+def _fetch_user_row(db: Session, email: str) -> dict | None:
+    """Fetch a user's column values as a plain dict, safe to share across sessions."""
+    row = db.execute(select(User.__table__).where(User.email == email)).mappings().first()
+    return dict(row) if row else None
+
+def _attach_user(db: Session, row: dict) -> User:
+    """Build a persistent User in this request's session from a shared row, without a query."""
+    user = User(**row)
+    # Key the instance by its shard too, as rows loaded from that shard are
+    inspect(user).identity_token = shard_for(user.email)
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+def _revoked_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been revoked",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _principal_from_claims(db: Session, payload: dict) -> Principal:
+    """Build the principal from token claims, checking only the cached token version."""
+    current = token_versions.get(db, payload["sub"])
+    if current is None or current != (payload["uid"], payload["ver"]):
+        raise _revoked_token()
+    return Principal(
+        id=payload["uid"],
+        email=payload["sub"],
+        full_name=payload.get("name"),
+        role=payload["role"],
+        token_version=payload["ver"],
+    )
+
+def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User | Principal:
     """
     Dependency to get the currently authenticated user.
 
+    In stateless mode, tokens carrying user claims are resolved to a Principal
+    without loading the user row; otherwise the user is loaded from the database.
+
     Args:
         db (Session): Database session (injected via Depends)
         token (str): JWT token extracted from the Authorization header
 
     Returns:
-        User: The currently authenticated user object
+        User | Principal: The currently authenticated user object
 
     Raises:
-        HTTPException 401: If the token is invalid or the user does not exist
+        HTTPException 401: If the token is invalid or revoked, or the user does not exist
     """
     payload = verify_token(token)
     if not payload or "sub" not in payload:
@@ -29,30 +94,60 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    user = db.query(User).filter(User.email == payload["sub"]).first()
-    if not user:
+
+    if jwt_settings.stateless_auth and {"uid", "role", "ver"} <= payload.keys():
+        principal = _principal_from_claims(db, payload)
+        release_connection(db)
+        activity_tracker.record_seen(principal.id, shard_for(principal.email))
+        return principal
+
+    email = payload["sub"]
+    row = user_lookups.do(email, lambda: _fetch_user_row(db, email))
+    # The handler checks out a connection again only if it queries
+    release_connection(db)
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # A re-registered email gets a new ID and starts again at token version 0
+    if ("uid" in payload and payload["uid"] != row["id"]) or ("ver" in payload and payload["ver"] != row["token_version"]):
+        raise _revoked_token()
+    user = _attach_user(db, row)
+    activity_tracker.record_seen(user.id, shard_for(user.email))
     return user
 
 
-def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+@functools.cache
+def require_permissions(*permissions: Permission) -> Callable:
     """
-    Ensure the current user has admin privileges.
+    Build a dependency that requires the current user to hold all the given permissions.
 
-    Raises:
-        HTTPException: 403 Forbidden if user is not admin
+    The required mask is computed once per permission set, and the same
+    dependency is returned for the same arguments, so a check is a single
+    AND against the user's mask with no extra queries.
+
+    Args:
+        *permissions (Permission): Permissions required, all of them.
 
     Returns:
-        User: Admin user
+        Callable: Dependency returning the current user.
+
+    Raises:
+        HTTPException 403: From the dependency, if a permission is missing
     """
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin access required"
-        )
-    return current_user
\ No newline at end of file
+    required = functools.reduce(operator.or_, permissions, Permission.NONE)
+
+    def check_permissions(current_user: User | Principal = Depends(get_current_user)) -> User | Principal:
+        if current_user.permissions & required != required:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient permissions"
+            )
+        return current_user
+    return check_permissions
+
+
+# Requires every permission of the admin role
+get_admin_user = require_permissions(ROLE_PERMISSIONS["admin"])
@@ -0,0 +1,122 @@
+import asyncio
+import itertools
+import json
+import threading
+from datetime import datetime, timezone
+from typing import AsyncIterator
+from app.core.config import event_settings
+
+
+class Subscription:
+    """
+    One subscriber's bounded event buffer.
+
+    Args:
+        buffer_size (int): Events buffered before the subscriber is dropped.
+    """
+
+    def __init__(self, buffer_size: int):
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = False
+
+
+class EventBus:
+    """
+    In-process pub/sub for user change events.
+
+    Services publish from any thread; delivery happens on the subscribers'
+    event loop with one callback per loop, however many subscribers there
+    are. A subscriber whose buffer is full is dropped rather than slowing
+    down publishers or other subscribers.
+
+    Args:
+        buffer_size (int): Per-subscriber buffer size.
+    """
+
+    def __init__(self, buffer_size: int):
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._subscribers: dict[asyncio.AbstractEventLoop, set[Subscription]] = {}
+        self._sequence = itertools.count(1)
+
+    def subscribe(self) -> Subscription:
+        """Register a subscriber on the running event loop."""
+        subscription = Subscription(self.buffer_size)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.setdefault(loop, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber."""
+        with self._lock:
+            for loop, subscriptions in list(self._subscribers.items()):
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[loop]
+
+    def subscriber_count(self) -> int:
+        """Return the number of connected subscribers."""
+        return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    def publish(self, event_type: str, data: dict) -> None:
+        """
+        Publish an event to all subscribers. Safe to call from any thread; cheap when nobody listens.
+
+        Args:
+            event_type (str): Event name, e.g. "user.registered".
+            data (dict): JSON-serializable payload.
+        """
+        if not self._subscribers:
+            return
+        event = {
+            "id": next(self._sequence),
+            "type": event_type,
+            "data": {**data, "at": datetime.now(timezone.utc).isoformat()},
+        }
+        with self._lock:
+            loops = list(self._subscribers)
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._deliver, loop, event)
+            except RuntimeError:
+                # Loop already closed; its subscribers are gone
+                with self._lock:
+                    self._subscribers.pop(loop, None)
+
+    def _deliver(self, loop: asyncio.AbstractEventLoop, event: dict) -> None:
+        for subscription in list(self._subscribers.get(loop, ())):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscription.dropped = True
+                self.unsubscribe(subscription)
+
+
+def format_sse(event: dict) -> str:
+    """Format an event as a Server-Sent Events message."""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+async def stream_events(bus: EventBus, heartbeat_seconds: float) -> AsyncIterator[str]:
+    """
+    Yield Server-Sent Events for one subscriber, with heartbeat comments while idle.
+
+    The stream ends with a ``dropped`` event if the subscriber fell too far behind.
+    """
+    subscription = bus.subscribe()
+    try:
+        yield "retry: 5000\n\n"
+        while not subscription.dropped:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            yield format_sse(event)
+        yield "event: dropped\ndata: {}\n\n"
+    finally:
+        bus.unsubscribe(subscription)
+
+
+event_bus = EventBus(buffer_size=event_settings.events_subscriber_buffer)
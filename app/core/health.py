@@ -0,0 +1,116 @@
+import threading
+import time
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from app.core.activity import activity_tracker
+from app.core.circuit_breaker import OPEN, CircuitBreaker
+from app.core.config import health_settings
+from app.core.database import circuit_breakers, engines
+
+
+class ReadinessProbe:
+    """
+    Cached, rate-limited readiness checks.
+
+    The checks run at most once per ``cache_seconds``; concurrent callers
+    reuse the last result instead of probing again, so load balancer probes
+    never add meaningful load to the database.
+
+    Args:
+        engines (dict[str, Engine]): Engines whose pools and connectivity are checked, by shard ID.
+            With more than one engine, the pool and database checks are reported per shard.
+        cache_seconds (float): How long a result is reused.
+        pool_saturation_threshold (float): Fraction of pool capacity in use above which the app is not ready.
+        max_activity_backlog (int): Pending activity writes above which the app is not ready.
+        circuit_breakers (dict[str, CircuitBreaker], optional): Circuit breakers of the engines, by shard ID.
+            The app is not ready while one is open.
+    """
+
+    def __init__(self, engines: dict[str, Engine], cache_seconds: float, pool_saturation_threshold: float, max_activity_backlog: int,
+                 circuit_breakers: dict[str, CircuitBreaker] | None = None):
+        self.engines = engines
+        self.circuit_breakers = circuit_breakers or {}
+        self.cache_seconds = cache_seconds
+        self.pool_saturation_threshold = pool_saturation_threshold
+        self.max_activity_backlog = max_activity_backlog
+        self._lock = threading.Lock()
+        self._result: dict | None = None
+        self._checked_at = 0.0
+
+    def check(self) -> dict:
+        """
+        Return the readiness report, running the checks only if the cached one is stale.
+
+        Returns:
+            dict: ``{"ready": bool, "checks": {name: details}}``
+        """
+        result = self._result
+        if result is not None and time.monotonic() - self._checked_at < self.cache_seconds:
+            return result
+        # Only one caller probes; the others keep serving the previous result.
+        if not self._lock.acquire(blocking=result is None):
+            return result
+        try:
+            if self._result is not None and time.monotonic() - self._checked_at < self.cache_seconds:
+                return self._result
+            self._result = self._run_checks()
+            self._checked_at = time.monotonic()
+            return self._result
+        finally:
+            self._lock.release()
+
+    def _run_checks(self) -> dict:
+        checks = {"activity_backlog": self._check_activity_backlog()}
+        for shard_id, shard_engine in self.engines.items():
+            suffix = f":{shard_id}" if len(self.engines) > 1 else ""
+            checks[f"pool{suffix}"] = pool_check = self._check_pool(shard_engine)
+            breaker = self.circuit_breakers.get(shard_id)
+            if breaker is not None:
+                circuit = breaker.snapshot()
+                checks[f"circuit{suffix}"] = {"ok": circuit["state"] != OPEN, **circuit}
+            # Skip the query when the pool is saturated: checkout would block until the pool timeout.
+            if not pool_check["ok"]:
+                checks[f"database{suffix}"] = {"ok": False, "detail": "skipped, pool saturated"}
+            elif breaker is not None and circuit["state"] == OPEN:
+                checks[f"database{suffix}"] = {"ok": False, "detail": "skipped, circuit open"}
+            else:
+                # While half-open, this query is one of the probes that can close the circuit
+                checks[f"database{suffix}"] = self._check_database(shard_engine)
+        return {"ready": all(check["ok"] for check in checks.values()), "checks": checks}
+
+    def _check_pool(self, engine: Engine) -> dict:
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            return {"ok": True}
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        checked_out = pool.checkedout()
+        saturation = checked_out / capacity if capacity else 0.0
+        return {
+            "ok": saturation < self.pool_saturation_threshold,
+            "checked_out": checked_out,
+            "capacity": capacity,
+            "saturation": round(saturation, 3),
+        }
+
+    def _check_activity_backlog(self) -> dict:
+        pending = activity_tracker.pending_count()
+        return {"ok": pending <= self.max_activity_backlog, "pending": pending}
+
+    def _check_database(self, engine: Engine) -> dict:
+        started = time.perf_counter()
+        try:
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except Exception as e:
+            return {"ok": False, "detail": type(e).__name__}
+        return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+readiness_probe = ReadinessProbe(
+    engines=engines,
+    cache_seconds=health_settings.readiness_cache_seconds,
+    pool_saturation_threshold=health_settings.readiness_pool_saturation_threshold,
+    max_activity_backlog=health_settings.readiness_max_activity_backlog,
+    circuit_breakers=circuit_breakers,
+)
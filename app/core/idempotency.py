@@ -0,0 +1,269 @@
+import asyncio
+import hashlib
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from app.core.config import idempotency_settings
+from app.core.database import dialect_insert, engine
+from app.core.profiling import PROFILE_ID_HEADER
+from app.models.idempotency_model import IdempotencyRecord
+
+IDEMPOTENCY_KEY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+# Only these routes honour the header. Token endpoints (login, refresh) are deliberately left out:
+# their responses hold live credentials, which must never be stored or replayed.
+IDEMPOTENT_ROUTES = {("POST", "/auth/register"), ("PUT", "/users/me"), ("PATCH", "/users/me")}
+
+_MAX_KEY_LENGTH = 255
+# Larger responses are passed through but not stored
+_MAX_STORED_BODY_BYTES = 1024 * 1024
+# Per-request headers that must not be replayed
+_NOT_REPLAYED_HEADERS = {PROFILE_ID_HEADER.lower().encode()}
+
+
+class StoredResponse:
+    """A response stored for an idempotency key, with the fingerprint of the request that produced it."""
+    __slots__ = ("fingerprint", "status_code", "headers", "body")
+
+    def __init__(self, fingerprint: str, status_code: int, headers: list[tuple[bytes, bytes]], body: bytes):
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+
+class MemoryIdempotencyStore:
+    """
+    Per-process store of responses, evicted after ``ttl`` seconds or least recently used first.
+
+    Args:
+        ttl (float): Seconds a response is replayed.
+        max_entries (int): Maximum stored responses.
+    """
+    blocking = False
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, StoredResponse]] = OrderedDict()
+
+    def get(self, key: str) -> StoredResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, response: StoredResponse) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DatabaseIdempotencyStore:
+    """
+    Store of responses in the ``idempotency_keys`` table, shared by all processes using the database.
+
+    Expired rows are never replayed and are deleted in bulk every ``prune_every`` writes.
+
+    Args:
+        engine (Engine): Engine of the database holding the table.
+        ttl (float): Seconds a response is replayed.
+        prune_every (int): Writes between deletions of expired rows.
+    """
+    blocking = True
+
+    def __init__(self, engine: Engine, ttl: float, prune_every: int = 100):
+        self.engine = engine
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self._writes = itertools.count(1)
+        self._table = IdempotencyRecord.__table__
+
+    def get(self, key: str) -> StoredResponse | None:
+        table = self._table
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                select(table).where(table.c.key == key, table.c.expires_at > time.time())
+            ).first()
+        if row is None:
+            return None
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in json.loads(row.headers)]
+        return StoredResponse(row.fingerprint, row.status_code, headers, row.body)
+
+    def put(self, key: str, response: StoredResponse) -> None:
+        table = self._table
+        values = {
+            "fingerprint": response.fingerprint,
+            "status_code": response.status_code,
+            "headers": json.dumps([[name.decode("latin-1"), value.decode("latin-1")] for name, value in response.headers]),
+            "body": response.body,
+            "expires_at": time.time() + self.ttl,
+        }
+        # Overwrites an expired row left behind for the same key
+        statement = dialect_insert(table).values(key=key, **values).on_conflict_do_update(index_elements=[table.c.key], set_=values)
+        with self.engine.begin() as connection:
+            connection.execute(statement)
+            if next(self._writes) % self.prune_every == 0:
+                connection.execute(delete(table).where(table.c.expires_at <= time.time()))
+
+
+def _error(status_code: int, detail: str) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"detail": detail})
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware implementing the ``Idempotency-Key`` header on an allow-list of routes.
+
+    The first response for a key (scoped to the method, path and credentials)
+    is stored and replayed, with ``Idempotent-Replayed: true``, for retries
+    with the same body; the work is not repeated. Reusing a key with a
+    different body is rejected with 422. A retry arriving while the first
+    request is still running waits for its result instead of running
+    concurrently, up to ``wait_timeout`` seconds, then gets 409. Server
+    errors (5xx) are not stored, so they can be retried.
+
+    Args:
+        store: MemoryIdempotencyStore or DatabaseIdempotencyStore.
+        wait_timeout (float): Seconds a retry waits for an in-flight request with the same key.
+        routes (set[tuple[str, str]]): ``(method, path)`` pairs honouring the header; it is ignored elsewhere.
+    """
+
+    def __init__(self, app, store, wait_timeout: float, routes: set[tuple[str, str]] = IDEMPOTENT_ROUTES):
+        self.app = app
+        self.store = store
+        self.wait_timeout = wait_timeout
+        self.routes = routes
+        self._in_flight: dict[str, tuple[str, asyncio.Future]] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"]) not in self.routes:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(IDEMPOTENCY_KEY_HEADER)
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not 0 < len(idempotency_key) <= _MAX_KEY_LENGTH:
+            await _error(400, "Invalid Idempotency-Key header")(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        key = hashlib.sha256("\n".join((
+            scope["method"], scope["path"], headers.get("authorization", ""), idempotency_key,
+        )).encode()).hexdigest()
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout
+        while True:
+            stored = await self._call(self.store.get, key)
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    await _error(422, "Idempotency-Key was already used with a different request")(scope, receive, send)
+                else:
+                    await self._replay(stored, send)
+                return
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+            if in_flight[0] != fingerprint:
+                await _error(422, "Idempotency-Key was already used with a different request")(scope, receive, send)
+                return
+            try:
+                await asyncio.wait_for(asyncio.shield(in_flight[1]), timeout=max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                await _error(409, "A request with this Idempotency-Key is still in progress")(scope, receive, send)
+                return
+            # The first request finished: replay its stored response, or run this one if nothing was stored
+
+        future = loop.create_future()
+        self._in_flight[key] = (fingerprint, future)
+        try:
+            response = await self._run(scope, body, receive, send, fingerprint)
+            if response is not None:
+                await self._call(self.store.put, key, response)
+        finally:
+            del self._in_flight[key]
+            future.set_result(None)
+
+    async def _call(self, fn, *args):
+        return await run_in_threadpool(fn, *args) if self.store.blocking else fn(*args)
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    async def _run(self, scope, body: bytes, receive, send, fingerprint: str) -> StoredResponse | None:
+        """Run the request with its already-read body and capture the response, if it may be stored."""
+        body_sent = False
+
+        async def receive_body():
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        status_code = None
+        response_headers: list[tuple[bytes, bytes]] = []
+        chunks: list[bytes] = []
+        size = 0
+
+        async def capture_send(message):
+            nonlocal status_code, response_headers, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = [(name, value) for name, value in message.get("headers", []) if name.lower() not in _NOT_REPLAYED_HEADERS]
+            elif message["type"] == "http.response.body" and size <= _MAX_STORED_BODY_BYTES:
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                chunks.append(chunk)
+            await send(message)
+
+        await self.app(scope, receive_body, capture_send)
+        if status_code is None or status_code >= 500 or size > _MAX_STORED_BODY_BYTES:
+            return None
+        return StoredResponse(fingerprint, status_code, response_headers, b"".join(chunks))
+
+    @staticmethod
+    async def _replay(stored: StoredResponse, send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": stored.status_code,
+            "headers": [*stored.headers, (REPLAYED_HEADER.lower().encode(), b"true")],
+        })
+        await send({"type": "http.response.body", "body": stored.body})
+
+
+if idempotency_settings.idempotency_store == "database":
+    idempotency_store = DatabaseIdempotencyStore(engine, ttl=idempotency_settings.idempotency_ttl_seconds)
+else:
+    idempotency_store = MemoryIdempotencyStore(
+        ttl=idempotency_settings.idempotency_ttl_seconds,
+        max_entries=idempotency_settings.idempotency_max_entries,
+    )
@@ -0,0 +1,176 @@
+import asyncio
+import bisect
+import itertools
+from collections import Counter
+from enum import IntEnum
+from starlette.responses import JSONResponse
+from app.core.config import load_shedding_settings
+
+# Probes must keep answering while the app sheds load; event streams are
+# long-lived and would otherwise hold a slot for their whole lifetime
+EXEMPT_PATHS = {"/", "/healthz", "/readyz", "/users/events"}
+
+
+class Priority(IntEnum):
+    """Request priority classes; lower values are admitted first."""
+    CRITICAL = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+
+class _Waiter:
+    __slots__ = ("route", "future")
+
+    def __init__(self, route: str, future: asyncio.Future):
+        self.route = route
+        self.future = future
+
+
+class ConcurrencyLimiter:
+    """
+    Global and per-route in-flight limits with a bounded priority wait queue.
+
+    Requests over the limits wait in a queue ordered by priority, then
+    arrival. When the queue is full, a new request displaces the
+    lowest-priority waiter if it outranks it, and is rejected otherwise.
+    Waiters give up after ``queue_timeout`` seconds. Must only be used from
+    the event loop thread.
+
+    Args:
+        max_in_flight (int): Maximum concurrently running requests.
+        max_queue (int): Maximum waiting requests.
+        queue_timeout (float): Seconds a request may wait for a slot.
+        route_limits (dict[str, int]): Per-route in-flight limits, keyed by "METHOD /path".
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float, route_limits: dict[str, int]):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.route_limits = route_limits
+        self.in_flight = 0
+        self.route_in_flight: Counter[str] = Counter()
+        self._queue: list[tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    async def acquire(self, route: str, priority: int) -> bool:
+        """
+        Wait for a slot for one request.
+
+        Args:
+            route (str): Route key, "METHOD /path".
+            priority (int): Priority class of the request.
+
+        Returns:
+            bool: True if the request may run (``release`` must follow), False if it was shed.
+        """
+        if self._has_capacity(route):
+            self._take(route)
+            return True
+
+        if len(self._queue) >= self.max_queue:
+            if not self._queue or self._queue[-1][0] <= priority:
+                return False
+            _, _, lowest = self._queue.pop()
+            lowest.future.set_result(False)
+
+        waiter = _Waiter(route, asyncio.get_running_loop().create_future())
+        entry = (priority, next(self._sequence), waiter)
+        bisect.insort(self._queue, entry)
+        try:
+            await asyncio.wait({waiter.future}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(entry)
+            raise
+        if not waiter.future.done():
+            self._abandon(entry)
+            return False
+        return waiter.future.result()
+
+    def release(self, route: str) -> None:
+        """Free the slot taken by a request and hand it to the next eligible waiter."""
+        self.in_flight -= 1
+        if route in self.route_limits:
+            self.route_in_flight[route] -= 1
+        index = 0
+        while index < len(self._queue) and self.in_flight < self.max_in_flight:
+            waiter = self._queue[index][2]
+            if self._has_capacity(waiter.route):
+                del self._queue[index]
+                self._take(waiter.route)
+                waiter.future.set_result(True)
+            else:
+                index += 1
+
+    def _has_capacity(self, route: str) -> bool:
+        if self.in_flight >= self.max_in_flight:
+            return False
+        limit = self.route_limits.get(route)
+        return limit is None or self.route_in_flight[route] < limit
+
+    def _take(self, route: str) -> None:
+        self.in_flight += 1
+        if route in self.route_limits:
+            self.route_in_flight[route] += 1
+
+    def _abandon(self, entry: tuple[int, int, _Waiter]) -> None:
+        waiter = entry[2]
+        if waiter.future.done():
+            # Granted a slot at the same moment it gave up: pass the slot on.
+            if waiter.future.result():
+                self.release(waiter.route)
+            return
+        self._queue.remove(entry)
+        waiter.future.cancel()
+
+
+class LoadSheddingMiddleware:
+    """
+    ASGI middleware that admits requests through a ConcurrencyLimiter.
+
+    Requests that cannot get a slot in time are answered immediately with
+    503 and ``Retry-After`` instead of piling up in the threadpool.
+
+    Args:
+        limiter (ConcurrencyLimiter): Shared limiter.
+        route_priorities (dict[str, int]): Priority per "METHOD /path"; others are NORMAL.
+    """
+
+    def __init__(self, app, limiter: ConcurrencyLimiter, route_priorities: dict[str, int]):
+        self.app = app
+        self.limiter = limiter
+        self.route_priorities = route_priorities
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        route = f"{scope['method']} {scope['path']}"
+        priority = self.route_priorities.get(route, Priority.NORMAL)
+        if not await self.limiter.acquire(route, priority):
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is overloaded, please retry later"},
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release(route)
+
+
+limiter = ConcurrencyLimiter(
+    max_in_flight=load_shedding_settings.load_shedding_max_in_flight,
+    max_queue=load_shedding_settings.load_shedding_max_queue,
+    queue_timeout=load_shedding_settings.load_shedding_queue_timeout_seconds,
+    route_limits=load_shedding_settings.load_shedding_route_limits,
+)
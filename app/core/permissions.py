@@ -0,0 +1,29 @@
+from enum import IntFlag, auto
+
+
+class Permission(IntFlag):
+    """
+    Permissions as bits of a mask, so a check is a single AND.
+
+    Every authenticated user may read and change their own profile; these
+    permissions only guard access to other users' data and operator tools.
+    """
+    NONE = 0
+    USERS_READ = auto()  # list users and user statistics
+    USERS_AUDIT = auto()  # user change feed and event stream
+    PROFILES_READ = auto()  # request profiles
+    TOKENS_INTROSPECT = auto()  # check other users' tokens, e.g. from a gateway
+
+
+# Permission mask of each role, resolved once per user instead of per check
+ROLE_PERMISSIONS: dict[str, Permission] = {
+    "user": Permission.NONE,
+    # Gateways and internal services
+    "service": Permission.TOKENS_INTROSPECT,
+    "admin": Permission.USERS_READ | Permission.USERS_AUDIT | Permission.PROFILES_READ | Permission.TOKENS_INTROSPECT,
+}
+
+
+def permissions_for_role(role: str) -> Permission:
+    """Return the permission mask of a role; unknown roles have no permissions."""
+    return ROLE_PERMISSIONS.get(role, Permission.NONE)
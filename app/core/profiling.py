@@ -0,0 +1,296 @@
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from app.core.config import profiling_settings
+from app.core.database import SessionLocal
+from app.core.permissions import Permission, permissions_for_role
+from app.core.security import verify_token
+from app.core.token_versions import token_versions
+
+PROFILE_HEADER = "x-profile"
+PROFILE_MEMORY_HEADER = "x-profile-memory"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+_APP_DIR = str(Path(__file__).resolve().parent.parent)
+_WORKER_THREAD_NAME = "AnyIO worker thread"
+_PROFILE_ID_PATTERN = re.compile(r"^[\w-]+$")
+
+
+class StackSampler:
+    """
+    Sampling CPU profiler for one request.
+
+    FastAPI runs sync routes and dependencies in threadpool workers, which a
+    per-thread profiler like cProfile cannot follow. Instead, a background
+    thread periodically snapshots the stacks of the event loop thread and the
+    threadpool workers, keeping only stacks that are inside application code.
+    Results are folded stacks (``frame;frame;frame count``), readable by
+    flamegraph.pl and speedscope. Other requests running concurrently on the
+    same workers will also show up in the samples.
+
+    Args:
+        interval (float): Seconds between samples.
+        loop_thread_id (int): Ident of the thread running the event loop.
+    """
+
+    def __init__(self, interval: float, loop_thread_id: int):
+        self.interval = interval
+        self.loop_thread_id = loop_thread_id
+        self.samples: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return the folded stacks."""
+        self._stop_event.set()
+        self._thread.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            worker_ids = {thread.ident for thread in threading.enumerate() if thread.name == _WORKER_THREAD_NAME}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.loop_thread_id or thread_id in worker_ids:
+                    stack = self._fold(frame)
+                    if stack:
+                        self.samples[stack] += 1
+
+    @staticmethod
+    def _fold(frame) -> str | None:
+        frames = []
+        in_app = False
+        while frame is not None:
+            code = frame.f_code
+            filename = code.co_filename
+            if filename.startswith(_APP_DIR) and filename != __file__:
+                in_app = True
+            frames.append(f"{code.co_name} ({os.path.basename(filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(frames)) if in_app else None
+
+
+class MemoryTracer:
+    """
+    Allocation snapshot for one request using tracemalloc.
+
+    tracemalloc is process-wide, so tracing is reference counted across
+    overlapping profiled requests and only stopped by the last one.
+    """
+
+    _lock = threading.Lock()
+    _users = 0
+
+    def __init__(self, top: int = 50):
+        self.top = top
+
+    def start(self) -> None:
+        with MemoryTracer._lock:
+            if MemoryTracer._users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(25)
+            MemoryTracer._users += 1
+
+    def stop(self) -> str:
+        """Take the snapshot, stop tracing if no one else needs it and return a text report."""
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        with MemoryTracer._lock:
+            MemoryTracer._users -= 1
+            if MemoryTracer._users == 0:
+                tracemalloc.stop()
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        lines = [f"peak traced memory: {peak} bytes", ""]
+        lines.extend(str(stat) for stat in snapshot.statistics("lineno")[:self.top])
+        return "\n".join(lines) + "\n"
+
+
+class ProfileStore:
+    """
+    Bounded on-disk ring of request profiles.
+
+    Each profile is a set of files sharing one profile ID (``<id>.folded`` and
+    optionally ``<id>.alloc.txt``). When more than ``max_profiles`` profiles
+    exist, the oldest are deleted.
+
+    Args:
+        directory (str): Directory where profiles are written.
+        max_profiles (int): Number of profiles to keep, at least 1.
+    """
+
+    def __init__(self, directory: str, max_profiles: int):
+        if max_profiles < 1:
+            raise ValueError("max_profiles must be at least 1")
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def save(self, profile_id: str, files: dict[str, str]) -> None:
+        """
+        Write a profile's files and evict the oldest profiles beyond the limit.
+
+        Args:
+            profile_id (str): Profile ID, used as the file name stem.
+            files (dict[str, str]): File suffix to file content.
+        """
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for suffix, content in files.items():
+                (self.directory / f"{profile_id}{suffix}").write_text(content)
+            profile_ids = sorted({path.name.split(".", 1)[0] for path in self.directory.iterdir() if path.is_file()})
+            for stale_id in profile_ids[:-self.max_profiles]:
+                for path in self.directory.glob(f"{stale_id}.*"):
+                    path.unlink(missing_ok=True)
+
+    def list(self) -> list[dict]:
+        """
+        List stored profile files, newest first.
+
+        Returns:
+            list[dict]: ``name``, ``size`` and ``created_at`` of each file.
+        """
+        if not self.directory.is_dir():
+            return []
+        files = []
+        for path in self.directory.iterdir():
+            if path.is_file():
+                stat = path.stat()
+                files.append({
+                    "name": path.name,
+                    "size": stat.st_size,
+                    "created_at": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+                })
+        return sorted(files, key=lambda file: file["name"], reverse=True)
+
+    def path_for(self, name: str) -> Path | None:
+        """
+        Resolve a stored file by name.
+
+        Args:
+            name (str): File name as returned by ``list``.
+
+        Returns:
+            Path | None: Path to the file, or None if no such profile file exists.
+        """
+        stem, _, suffix = name.partition(".")
+        if not _PROFILE_ID_PATTERN.match(stem) or "/" in suffix or "\\" in suffix:
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+
+def new_profile_id(method: str, path: str) -> str:
+    """Build a sortable, filesystem-safe profile ID for a request."""
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    slug = re.sub(r"[^\w]+", "_", path).strip("_")[:40] or "root"
+    return f"{timestamp}-{method}-{slug}-{uuid.uuid4().hex[:8]}"
+
+
+def can_trigger_profiling(token: str) -> bool:
+    """
+    Whether a bearer token may trigger profiling: it must be valid, not
+    revoked, and its role must hold ``Permission.PROFILES_READ``.
+    """
+    payload = verify_token(token)
+    if not payload or not {"sub", "uid", "role", "ver"} <= payload.keys():
+        return False
+    if not permissions_for_role(payload["role"]) & Permission.PROFILES_READ:
+        return False
+    # A role change bumps the token version, so a current version means a current role
+    with SessionLocal() as db:
+        return token_versions.get(db, payload["sub"]) == (payload["uid"], payload["ver"])
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles selected requests.
+
+    A request is profiled when it carries ``X-Profile: <PROFILING_SECRET>``
+    together with a bearer token allowed by ``authorize`` (by default one
+    holding ``PROFILES_READ``; disabled while the secret is empty), or when it
+    is picked by ``PROFILING_SAMPLE_RATE``. ``X-Profile-Memory: 1`` on a
+    triggered request, or ``PROFILING_TRACE_MEMORY``, adds a tracemalloc
+    snapshot. Only a triggered request's response carries the ID of its
+    profile in ``X-Profile-Id``; sampled profiles are found through the admin
+    endpoints.
+    """
+
+    def __init__(
+        self,
+        app,
+        store: ProfileStore,
+        secret: str,
+        sample_rate: float,
+        sample_interval: float,
+        trace_memory: bool,
+        authorize: Callable[[str], bool] = can_trigger_profiling,
+    ):
+        self.app = app
+        self.store = store
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.sample_interval = sample_interval
+        self.trace_memory = trace_memory
+        self.authorize = authorize
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        requested = await self._is_authorized_trigger(headers)
+        if not requested and not (self.sample_rate > 0 and random.random() < self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id(scope["method"], scope["path"])
+        sampler = StackSampler(self.sample_interval, loop_thread_id=threading.get_ident())
+        memory_tracer = None
+        if self.trace_memory or (requested and headers.get(PROFILE_MEMORY_HEADER) == "1"):
+            memory_tracer = MemoryTracer()
+            memory_tracer.start()
+        sampler.start()
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER.lower().encode(), profile_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id if requested else send)
+        finally:
+            await run_in_threadpool(self._finish, profile_id, sampler, memory_tracer)
+
+    async def _is_authorized_trigger(self, headers: Headers) -> bool:
+        if not self.secret or not hmac.compare_digest(headers.get(PROFILE_HEADER, ""), self.secret):
+            return False
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        # The token check may query the token version
+        return await run_in_threadpool(self.authorize, token)
+
+    def _finish(self, profile_id: str, sampler: StackSampler, memory_tracer: MemoryTracer | None) -> None:
+        files = {".folded": sampler.stop()}
+        if memory_tracer is not None:
+            files[".alloc.txt"] = memory_tracer.stop()
+        self.store.save(profile_id, files)
+
+
+profile_store = ProfileStore(
+    directory=profiling_settings.profiling_dir,
+    max_profiles=profiling_settings.profiling_max_profiles,
+)
@@ -0,0 +1,44 @@
+import logging
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+from app.core.database import Base
+from app.models import idempotency_model, user_change_model, user_model  # noqa: F401  (registers their tables)
+
+logger = logging.getLogger(__name__)
+
+
+def upgrade_schema(engine: Engine) -> list[str]:
+    """
+    Bring a database up to the models: create missing tables, add missing columns.
+
+    ``create_all`` never alters an existing table, so columns added to a
+    model after a database was created are added here with
+    ``ALTER TABLE ... ADD COLUMN``, including their server default. A new
+    NOT NULL column must have a server default, so existing rows get a value.
+    Nothing is ever dropped or changed.
+
+    Args:
+        engine (Engine): Database to upgrade.
+
+    Returns:
+        list[str]: Added columns, as ``table.column``.
+    """
+    Base.metadata.create_all(bind=engine)
+    added = []
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} without a server default")
+                definition = CreateColumn(column).compile(dialect=connection.dialect)
+                table_name = connection.dialect.identifier_preparer.format_table(table)
+                connection.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN {definition}")
+                added.append(f"{table.name}.{column.name}")
+    for column_name in added:
+        logger.info("Added column %s", column_name)
+    return added
@@ -1,10 +1,18 @@
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from passlib.context import CryptContext
-from app.core.config import jwt_settings
+from app.core.config import jwt_settings, password_hash_settings
+from app.core.tracing import traced
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=password_hash_settings.argon2_time_cost,
+    argon2__memory_cost=password_hash_settings.argon2_memory_cost,
+    argon2__parallelism=password_hash_settings.argon2_parallelism,
+)
 
+@traced("argon2.hash")
 def get_password_hash(password: str) -> str:
     """
     Hash a plain password using Argon2.
@@ -18,6 +26,7 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+@traced("argon2.verify")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain password against a hashed password using Argon2.
@@ -31,6 +40,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     return pwd_context.verify(plain_password, hashed_password)
 
+@traced("jwt.encode")
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """
     Create a JWT access token.
@@ -48,6 +58,7 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return jwt.encode(to_encode, jwt_settings.secret_key, algorithm=jwt_settings.algorithm)
 
 
+@traced("jwt.encode")
 def create_refresh_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """
     Create a JWT refresh token (usually longer-lived than access token).
@@ -65,6 +76,7 @@ def create_refresh_token(data: dict, expires_delta: timedelta | None = None) ->
     return jwt.encode(to_encode, jwt_settings.secret_key, algorithm=jwt_settings.algorithm)
 
 
+@traced("jwt.decode")
 def verify_token(token: str) -> dict | None:
     """
     Verify a JWT token and return its payload.
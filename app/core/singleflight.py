@@ -0,0 +1,76 @@
+import threading
+from typing import Any, Callable, Hashable
+
+
+class _Call:
+    """An in-flight call whose result is shared by every caller of the same key."""
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for and share its result (or exception). Nothing is cached:
+    once the call finishes, the next caller starts a new one.
+
+    Args:
+        timeout (float): Default seconds a waiting caller waits for the shared
+            result before giving up and running the function itself.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: float | None = None) -> Any:
+        """
+        Run ``fn`` once for all concurrent callers of ``key``.
+
+        Args:
+            key (Hashable): Identifies identical calls.
+            fn (Callable): Zero-argument function to run.
+            timeout (float, optional): Per-call override of the wait timeout.
+
+        Returns:
+            Any: The shared result of ``fn``.
+
+        Raises:
+            Exception: Whatever ``fn`` raised for the caller that ran it.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            if not call.done.wait(self.timeout if timeout is None else timeout):
+                # The in-flight call is stuck; don't let it hold this request hostage.
+                return fn()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being executed."""
+        return len(self._calls)
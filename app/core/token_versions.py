@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy.orm import Session
+from app.core.config import jwt_settings
+from app.models.user_model import User
+
+
+class TokenVersionCache:
+    """
+    Short-lived cache of ``(user id, token version)`` by email.
+
+    Stateless authentication checks each access token's ``uid``/``ver`` claims
+    against this cache instead of loading the user row. Missing users are
+    cached too, so tokens of deleted users are rejected without a query.
+    Local writes invalidate entries immediately; changes made by other
+    processes are picked up after at most ``ttl`` seconds. A version loaded
+    while an invalidation ran may already be outdated, so it is returned but
+    not cached.
+
+    Args:
+        ttl (float): Seconds an entry stays valid.
+        max_entries (int): Maximum cached users; the oldest are evicted first.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, tuple[int, int] | None]] = OrderedDict()
+        # Bumped by every invalidation, so a load that raced one is not cached
+        self._generation = 0
+
+    def get(self, db: Session, email: str) -> tuple[int, int] | None:
+        """
+        Return the user's ID and current token version.
+
+        Args:
+            db (Session): Database session, used only on a cache miss.
+            email (str): User's email (token subject).
+
+        Returns:
+            tuple[int, int] | None: ``(id, token_version)``, or None if the user does not exist.
+        """
+        entry = self._entries.get(email)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        generation = self._generation
+        row = db.query(User.id, User.token_version).filter(User.email == email).first()
+        value = (row[0], row[1]) if row else None
+        with self._lock:
+            if generation != self._generation:
+                return value
+            self._entries[email] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, email: str) -> None:
+        """
+        Drop a user's cached version after it changed locally.
+
+        Args:
+            email (str): User's email.
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(email, None)
+
+    def clear(self) -> None:
+        """Drop all cached versions."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+token_versions = TokenVersionCache(
+    ttl=jwt_settings.token_version_cache_seconds,
+    max_entries=jwt_settings.token_version_cache_size,
+)
@@ -0,0 +1,369 @@
+import functools
+import json
+import re
+import secrets
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from app.core.config import tracing_settings
+
+REQUEST_ID_HEADER = "X-Request-ID"
+TRACEPARENT_HEADER = "traceparent"
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_MAX_STATEMENT_LENGTH = 2000
+_REQUEST_ID_PATTERN = re.compile(r"^[\w.:-]{1,128}$")
+_TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+def get_request_id() -> str | None:
+    """Return the ID of the request being handled, if any."""
+    return _request_id.get()
+
+
+class Span:
+    """
+    One timed operation within a trace.
+
+    Spans are only created for sampled requests; all spans of a request are
+    collected on its Trace and exported together when the request ends.
+    """
+    __slots__ = ("trace", "span_id", "parent_span_id", "name", "kind", "attributes", "start_ns", "end_ns", "status", "status_message")
+
+    def __init__(self, trace: "Trace", name: str, parent_span_id: str | None, kind: int, attributes: dict):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.status = STATUS_OK
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = type(error).__name__
+        self.attributes["exception.type"] = type(error).__name__
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.spans.append(self)
+
+
+class Trace:
+    """The spans of one sampled request."""
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: list[Span] = []
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: list[Span], service_name: str) -> dict:
+    """
+    Encode spans as an OTLP/JSON ``ExportTraceServiceRequest``.
+
+    Args:
+        spans (list[Span]): Finished spans.
+        service_name (str): Value of the ``service.name`` resource attribute.
+
+    Returns:
+        dict: JSON-serializable OTLP payload.
+    """
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [
+                    {
+                        "traceId": span.trace.trace_id,
+                        "spanId": span.span_id,
+                        **({"parentSpanId": span.parent_span_id} if span.parent_span_id else {}),
+                        "name": span.name,
+                        "kind": span.kind,
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.end_ns),
+                        "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+                        "status": {"code": span.status, **({"message": span.status_message} if span.status_message else {})},
+                    }
+                    for span in spans
+                ],
+            }],
+        }]
+    }
+
+
+class InMemorySpanExporter:
+    """Keeps exported spans in memory, e.g. for tests or a debug endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans: list[Span] = []
+
+    def export(self, spans: list[Span]) -> None:
+        with self._lock:
+            self._spans.extend(spans)
+
+    def get_finished_spans(self) -> list[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class FileSpanExporter:
+    """
+    Appends each exported trace to a file as one line of OTLP/JSON, the format
+    of the OpenTelemetry Collector's file exporter and ``otlpjsonfile`` receiver.
+
+    Args:
+        path (str): File to append to; its directory is created if needed.
+        service_name (str): Value of the ``service.name`` resource attribute.
+    """
+
+    def __init__(self, path: str, service_name: str):
+        self.path = Path(path)
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        line = json.dumps(to_otlp(spans, self.service_name), separators=(",", ":"))
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+
+
+class Tracer:
+    """
+    Creates spans for sampled requests.
+
+    Sampling is decided once per request from the trace ID, like
+    OpenTelemetry's ``TraceIdRatioBased`` sampler, unless an incoming W3C
+    ``traceparent`` header already carries the decision. Outside a sampled
+    request every tracing call is a cheap no-op.
+
+    Args:
+        exporter: Receives the finished spans of each sampled request.
+        sample_rate (float): Fraction of requests to trace, 0 to 1.
+    """
+
+    def __init__(self, exporter, sample_rate: float):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def should_sample(self, trace_id: str) -> bool:
+        return int(trace_id[16:], 16) < self.sample_rate * (1 << 64)
+
+    def start_span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes) -> Span | None:
+        """Start a child of the current span, without making it current. Returns None outside a sampled request."""
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        return Span(parent.trace, name, parent.span_id, kind, attributes)
+
+    @contextmanager
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+        """Run a block in a child span of the current span; yields None outside a sampled request."""
+        span = self.start_span(name, kind, **attributes)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as error:
+            span.record_error(error)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+
+def traced(name: str | None = None) -> Callable:
+    """
+    Decorator running each call of a sync function in a span.
+
+    Args:
+        name (str, optional): Span name. Defaults to "<module>.<function>", e.g. "auth_service.login_user".
+    """
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return fn(*args, **kwargs)
+            with tracer.span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TracedRoute(APIRoute):
+    """APIRoute that runs each request's handler, including its dependencies, in a span."""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        span_name = f"route {self.name}"
+
+        async def traced_handler(request):
+            if _current_span.get() is None:
+                return await handler(request)
+            with tracer.span(span_name):
+                return await handler(request)
+        return traced_handler
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware assigning every request an ID and tracing sampled requests.
+
+    The request ID is taken from a valid incoming ``X-Request-ID`` or
+    generated, and returned in the response's ``X-Request-ID``. Sampled
+    requests get a server span named after the matched route, which becomes
+    the parent of all spans created while handling the request.
+    """
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        request_id = headers.get(REQUEST_ID_HEADER, "")
+        if not _REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+        request_id_token = _request_id.set(request_id)
+
+        status_code = None
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER.lower().encode(), request_id.encode())]
+            await send(message)
+
+        root = self._start_root_span(headers, scope, request_id)
+        if root is None:
+            try:
+                await self.app(scope, receive, send_with_request_id)
+            finally:
+                _request_id.reset(request_id_token)
+            return
+
+        span_token = _current_span.set(root)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        except BaseException as error:
+            root.record_error(error)
+            raise
+        finally:
+            _current_span.reset(span_token)
+            _request_id.reset(request_id_token)
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"{scope['method']} {route.path}"
+                root.set_attribute("http.route", route.path)
+            if status_code is not None:
+                root.set_attribute("http.response.status_code", status_code)
+                if status_code >= 500:
+                    root.status = STATUS_ERROR
+            root.end()
+            await run_in_threadpool(self.tracer.exporter.export, root.trace.spans)
+
+    def _start_root_span(self, headers: Headers, scope, request_id: str) -> Span | None:
+        parent = _TRACEPARENT_PATTERN.match(headers.get(TRACEPARENT_HEADER, ""))
+        if parent:
+            trace_id, parent_span_id, flags = parent.groups()
+            if not int(flags, 16) & 1:
+                return None
+        else:
+            trace_id, parent_span_id = secrets.token_hex(16), None
+            if not self.tracer.should_sample(trace_id):
+                return None
+        return Span(Trace(trace_id), f"{scope['method']} {scope['path']}", parent_span_id, SPAN_KIND_SERVER, {
+            "http.request.method": scope["method"],
+            "url.path": scope["path"],
+            "request.id": request_id,
+        })
+
+
+# SQL statement spans for every engine, including shard engines
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_sql_span(conn, cursor, statement, parameters, context, executemany):
+    if _current_span.get() is None:
+        return
+    span = tracer.start_span("db.query", SPAN_KIND_CLIENT, **{
+        "db.system": conn.dialect.name,
+        "db.statement": statement[:_MAX_STATEMENT_LENGTH],
+    })
+    if executemany:
+        span.set_attribute("db.executemany", True)
+    context._trace_span = span
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_sql_span(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        span.end()
+
+
+@event.listens_for(Engine, "handle_error")
+def _fail_sql_span(exception_context):
+    span = getattr(exception_context.execution_context, "_trace_span", None)
+    if span is not None:
+        span.record_error(exception_context.original_exception)
+        span.end()
+
+
+def _create_exporter():
+    if tracing_settings.tracing_exporter == "memory":
+        return InMemorySpanExporter()
+    return FileSpanExporter(tracing_settings.tracing_file, tracing_settings.tracing_service_name)
+
+
+tracer = Tracer(exporter=_create_exporter(), sample_rate=tracing_settings.tracing_sample_rate)
@@ -1,20 +1,74 @@
-from fastapi import FastAPI
-from app.core.database import engine, Base
+import math
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from app.core.database import engines
 from app.core.config import AppSettings
+from app.core.activity import activity_tracker
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.schema import upgrade_schema
+from app.core.config import profiling_settings, load_shedding_settings, idempotency_settings
+from app.core.profiling import ProfilingMiddleware, profile_store
+from app.core.load_shedding import LoadSheddingMiddleware, limiter
+from app.core.tracing import TracingMiddleware, tracer
+from app.core.idempotency import IdempotencyMiddleware, idempotency_store
 from app.routes import root_route
+from app.routes import health_route
 from app.routes import auth_route
 from app.routes import user_route
+from app.routes import admin_route
 
 # Load app settings
 app_settings = AppSettings()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create or upgrade tables and start background workers on startup; drain them on shutdown."""
+    for shard_engine in engines.values():
+        upgrade_schema(shard_engine)
+    activity_tracker.start()
+    yield
+    activity_tracker.stop()
+
 # Initialize FastAPI
-app = FastAPI(title=app_settings.app_name)
+app = FastAPI(title=app_settings.app_name, lifespan=lifespan)
+
+# Middleware
+app.add_middleware(
+    ProfilingMiddleware,
+    store=profile_store,
+    secret=profiling_settings.profiling_secret,
+    sample_rate=profiling_settings.profiling_sample_rate,
+    sample_interval=profiling_settings.profiling_sample_interval_seconds,
+    trace_memory=profiling_settings.profiling_trace_memory,
+)
+# Shed load before doing any other work
+app.add_middleware(
+    LoadSheddingMiddleware,
+    limiter=limiter,
+    route_priorities=load_shedding_settings.load_shedding_route_priorities,
+)
+# Replays and retries waiting for an in-flight request never take a load shedding slot
+app.add_middleware(
+    IdempotencyMiddleware,
+    store=idempotency_store,
+    wait_timeout=idempotency_settings.idempotency_wait_timeout_seconds,
+)
+# Added last so it runs first: every response, even a shed one, carries a request ID
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
+# Fail fast while a database is known to be down, instead of waiting for connect timeouts
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, error: CircuitOpenError) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database unavailable, please retry later"},
+        headers={"Retry-After": str(max(math.ceil(error.retry_after), 1))},
+    )
 
 # Include routers
 app.include_router(root_route.router)
+app.include_router(health_route.router)
 app.include_router(auth_route.router)
 app.include_router(user_route.router)
-
-# Create tables
-Base.metadata.create_all(bind=engine)
+app.include_router(admin_route.router)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Float, Integer, LargeBinary, String, Text
+from app.core.database import Base
+
+class IdempotencyRecord(Base):
+    """
+    Represents a stored response for an Idempotency-Key, replayed for retries of the same request.
+
+    Attributes:
+        key (str): Primary key, hash of the method, path, credentials and Idempotency-Key header.
+        fingerprint (str): Hash of the request body the response belongs to.
+        status_code (int): HTTP status code of the response.
+        headers (str): Response headers as a JSON list of [name, value] pairs.
+        body (bytes): Response body.
+        expires_at (float): Unix time after which the record is no longer replayed.
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(64), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    headers = Column(Text, nullable=False)
+    body = Column(LargeBinary, nullable=False)
+    expires_at = Column(Float, nullable=False, index=True)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, func
+from app.core.database import Base
+
+class UserChange(Base):
+    """
+    Represents one entry of the user change log, written in the same transaction as the change.
+
+    Downstream sync jobs read the log in ``id`` order and resume from the last ``id`` they saw.
+    There is deliberately no foreign key to ``users``: entries for deleted users are tombstones.
+
+    Attributes:
+        id (int): Primary key, monotonically increasing; used as the change feed cursor.
+        user_id (int): ID of the changed user.
+        email (str): User's email at the time of the change.
+        op (str): Kind of change: "created", "updated" or "deleted".
+        changed_at (datetime): Timestamp of the change, automatically set by the database.
+    """
+    __tablename__ = "user_changes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    email = Column(String, nullable=False)
+    op = Column(String, nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, String, DateTime, event, func
+from sqlalchemy.orm.base import NO_VALUE, NEVER_SET
 from app.core.database import Base
+from app.core.permissions import Permission, permissions_for_role
 
 class User(Base):
     """
@@ -10,12 +12,35 @@ class User(Base):
         email (str): User's email, must be unique.
         hashed_password (str): Hashed password for authentication.
         full_name (str): User's full name.
+        role (str): User's role, e.g. "user" or "admin". Tokens carry it as a claim, so changing it
+            through the ORM bumps ``token_version``; a Core UPDATE of ``role`` must bump it too.
+        token_version (int): Bumped to revoke all tokens issued before, e.g. on password or role change.
         created_at (datetime): Timestamp when the user was created, automatically set by the database.
+        last_login_at (datetime): Timestamp of the user's last successful login.
+        last_seen_at (datetime): Timestamp of the user's last authenticated request (coalesced, see ActivityTracker).
+        permissions (Permission): Permission mask of the user's role.
     """
     __tablename__ = "users"
+    # Never reuse the ID of a deleted user (SQLite would), so its tokens' ``uid`` cannot match a new account
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     full_name = Column(String)
+    role = Column(String, nullable=False, default="user", server_default="user")
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_login_at = Column(DateTime(timezone=True), nullable=True)
+    last_seen_at = Column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def permissions(self) -> Permission:
+        return permissions_for_role(self.role)
+
+
+@event.listens_for(User.role, "set", active_history=True)
+def _revoke_tokens_on_role_change(user: User, value, old_value, initiator) -> None:
+    """Revoke the tokens of a user whose role changes, as they carry the old role."""
+    if old_value not in (NO_VALUE, NEVER_SET) and value != old_value:
+        user.token_version = User.token_version + 1
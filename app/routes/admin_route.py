@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from typing import List
+from app.core.dependencies import require_permissions
+from app.core.permissions import Permission
+from app.core.profiling import profile_store
+from app.models.user_model import User
+from app.schemas.profile_schema import ProfileFile
+from app.core.tracing import TracedRoute
+
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=TracedRoute)
+
+@router.get(
+    "/profiles",
+    response_model=List[ProfileFile],
+    summary="List request profiles (admin)",
+    description="List stored CPU (.folded) and allocation (.alloc.txt) profiles, newest first. Admins only."
+)
+def list_profiles(admin_user: User = Depends(require_permissions(Permission.PROFILES_READ))) -> List[ProfileFile]:
+    """List stored request profiles (admin only)."""
+    return profile_store.list()
+
+@router.get(
+    "/profiles/{name}",
+    response_class=FileResponse,
+    summary="Download a request profile (admin)",
+    description="Download a stored profile file by name. Admins only."
+)
+def download_profile(name: str, admin_user: User = Depends(require_permissions(Permission.PROFILES_READ))) -> FileResponse:
+    """Download a stored request profile (admin only)."""
+    path = profile_store.path_for(name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path, media_type="text/plain", filename=name)
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
 from typing import Annotated
-from app.core.database import get_db
-from app.schemas.user_schema import RefreshTokenRequest, UserCreate, UserInfo, Token
+from app.core.database import get_db, release_connection
+from app.core.dependencies import require_permissions
+from app.core.permissions import Permission
+from app.models.user_model import User
+from app.schemas.user_schema import RefreshTokenRequest, UserCreate, UserInfo, Token, TokenIntrospectionRequest, TokenIntrospectionResponse
 from app.services import auth_service
+from app.core.tracing import TracedRoute
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=TracedRoute)
 
 # Register a new user
 @router.post(
@@ -35,8 +39,25 @@ def login(user_create: UserCreate, db: Annotated[Session, Depends(get_db)]) -> T
     "/refresh", 
     response_model=Token,
     summary="Refresh JWT access token",
-    description="Use a valid refresh token to generate a new access token and refresh token."
+    description="Use a valid refresh token to generate a new access token and refresh token. Fails once the user was deleted or its tokens were revoked."
 )
-def refresh_token(refresh_token_request: RefreshTokenRequest) -> Token:
+def refresh_token(refresh_token_request: RefreshTokenRequest, db: Annotated[Session, Depends(get_db)]) -> Token:
     """Refresh JWT access token using a refresh token."""
-    return auth_service.refresh_tokens(refresh_token=refresh_token_request.refresh_token)
+    return auth_service.refresh_tokens(db=db, refresh_token=refresh_token_request.refresh_token)
+
+# Introspect a batch of tokens
+@router.post(
+    "/introspect",
+    response_model=TokenIntrospectionResponse,
+    summary="Introspect a batch of tokens",
+    description="Verify up to 100 tokens at once and return each token's validity, subject and expiry. Intended for gateways and internal services; requires a service or admin token."
+)
+def introspect(
+    introspection_request: TokenIntrospectionRequest,
+    db: Annotated[Session, Depends(get_db)],
+    caller: Annotated[User, Depends(require_permissions(Permission.TOKENS_INTROSPECT))],
+) -> TokenIntrospectionResponse:
+    """Introspect a batch of tokens (service or admin only)."""
+    response = auth_service.introspect_tokens(db=db, tokens=introspection_request.tokens)
+    release_connection(db)
+    return response
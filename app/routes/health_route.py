@@ -0,0 +1,29 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from typing import Dict
+from app.core.health import readiness_probe
+from app.core.tracing import TracedRoute
+
+router = APIRouter(tags=["health"], route_class=TracedRoute)
+
+@router.get(
+    "/healthz",
+    summary="Liveness probe",
+    description="Report that the process is up. Performs no I/O."
+)
+def liveness() -> Dict[str, str]:
+    """Return a static liveness response."""
+    return {"status": "ok"}
+
+@router.get(
+    "/readyz",
+    summary="Readiness probe",
+    description="Report whether the app can serve traffic: database reachable, its circuit breaker closed, connection pool not saturated and background writes keeping up. Results are cached for a few seconds."
+)
+def readiness() -> JSONResponse:
+    """Return the cached readiness report, with 503 when not ready."""
+    report = readiness_probe.check()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if report["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if report["ready"] else "not_ready", "checks": report["checks"]},
+    )
@@ -1,8 +1,9 @@
 from fastapi import APIRouter
 from app.core.config import app_settings
+from app.core.tracing import TracedRoute
 from typing import Dict
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 @router.get(
     "/", 
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
-from app.core.dependencies import get_admin_user, get_current_user
-from app.core.database import get_db
+from app.core.dependencies import get_current_user, require_permissions
+from app.core.permissions import Permission
+from app.core.database import get_db, release_connection
+from app.core.config import event_settings
+from app.core.events import event_bus, stream_events
 from app.models.user_model import User
-from app.schemas.user_schema import UserInfo, UserCreate
+from app.schemas.user_schema import UserInfo, UserCreate, UserUpdate, UserChangesResponse, UserStats
 from app.services import user_service
+from app.core.tracing import TracedRoute
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], route_class=TracedRoute)
 
 @router.get(
     "/me",
@@ -16,8 +22,12 @@ router = APIRouter(prefix="/users", tags=["Users"])
     description="Get profile info of the authenticated user."
 )
 def read_current_user(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> UserInfo:
-    """Return profile of the authenticated user."""
-    return user_service.get_user_by_email(email=current_user.email, db=db)
+    """Return profile of the authenticated user; only a stateless principal needs its row loaded."""
+    if isinstance(current_user, User):
+        return current_user
+    user = user_service.get_user_by_email(email=current_user.email, db=db)
+    release_connection(db)
+    return user
 
 @router.get(
     "/",
@@ -25,9 +35,56 @@ def read_current_user(db: Session = Depends(get_db), current_user: User = Depend
     summary="List all users (admin)",
     description="Retrieve all users. Admins only."
 )
-def list_users(db: Session = Depends(get_db), admin_user: User = Depends(get_admin_user)) -> List[UserInfo]:
+def list_users(db: Session = Depends(get_db), admin_user: User = Depends(require_permissions(Permission.USERS_READ))) -> List[UserInfo]:
     """List all users (admin only)."""
-    return user_service.list_all_users(db=db)
+    users = user_service.list_all_users(db=db)
+    # Serializing a long list must not hold a connection
+    release_connection(db)
+    return users
+
+@router.get(
+    "/stats",
+    response_model=UserStats,
+    summary="User statistics (admin)",
+    description="Number of users, in total and per shard. Admins only."
+)
+def user_stats(db: Session = Depends(get_db), admin_user: User = Depends(require_permissions(Permission.USERS_READ))) -> UserStats:
+    """Return user statistics (admin only)."""
+    stats = user_service.get_user_stats(db=db)
+    release_connection(db)
+    return stats
+
+@router.get(
+    "/changes",
+    response_model=UserChangesResponse,
+    summary="User change feed (admin)",
+    description="Users created, updated or deleted after the given cursor, oldest first. Resume with 'next_cursor'. Admins only."
+)
+def list_user_changes(
+    since: str = Query("0", description="Cursor returned by the previous page; 0 for the beginning"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of changes to return"),
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(require_permissions(Permission.USERS_AUDIT)),
+) -> UserChangesResponse:
+    """Return a page of the user change feed (admin only)."""
+    changes = user_service.list_user_changes(db=db, since=since, limit=limit)
+    release_connection(db)
+    return changes
+
+@router.get(
+    "/events",
+    summary="Stream user change events (admin)",
+    description="Server-Sent Events stream of user registrations, updates and deletions. Admins only."
+)
+async def user_events(db: Session = Depends(get_db), admin_user: User = Depends(require_permissions(Permission.USERS_AUDIT))) -> StreamingResponse:
+    """Stream user change events (admin only)."""
+    # The stream outlives the request's dependencies; give the connection back now
+    await run_in_threadpool(db.close)
+    return StreamingResponse(
+        stream_events(event_bus, heartbeat_seconds=event_settings.events_heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.put(
     "/me",
@@ -39,6 +96,16 @@ def update_current_user(updated_data: UserCreate, db: Session = Depends(get_db),
     """Update the authenticated user's profile."""
     return user_service.update_user(db=db, current_user=current_user, full_name=updated_data.full_name, password=updated_data.password)
 
+@router.patch(
+    "/me",
+    response_model=UserInfo,
+    summary="Partially update current user profile",
+    description="Update only the given fields (full name and/or password) of the authenticated user."
+)
+def patch_current_user(updated_data: UserUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> User:
+    """Partially update the authenticated user's profile."""
+    return user_service.update_user(db=db, current_user=current_user, **updated_data.model_dump(exclude_unset=True))
+
 @router.delete(
     "/me",
     response_model=dict,
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+# ===============================
+# Profiling schemas
+# ===============================
+
+class ProfileFile(BaseModel):
+    """
+    Schema for a stored request profile file.
+    """
+    name: str = Field(..., description="File name, used to download the file")
+    size: int = Field(..., description="File size in bytes")
+    created_at: datetime = Field(..., description="Time the profile was written")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "name": "20251107T214500000000Z-POST-auth_login-1a2b3c4d.folded",
+                "size": 5321,
+                "created_at": "2025-11-07T21:45:00Z"
+            }
+        }
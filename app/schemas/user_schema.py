@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from datetime import datetime
 
 # ===============================
@@ -23,6 +23,29 @@ class UserCreate(BaseModel):
         }
 
 
+class UserUpdate(BaseModel):
+    """
+    Schema for partially updating the current user's profile. Only fields that are sent are changed;
+    a field that is sent must not be null or empty.
+    """
+    full_name: str | None = Field(None, min_length=1, description="User's new full name")
+    password: str | None = Field(None, min_length=1, description="User's new password")
+
+    @model_validator(mode="after")
+    def reject_null_fields(self) -> "UserUpdate":
+        null_fields = sorted(field for field in self.model_fields_set if getattr(self, field) is None)
+        if null_fields:
+            raise ValueError(f"{', '.join(null_fields)} cannot be null")
+        return self
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "full_name": "Jane Doe"
+            }
+        }
+
+
 class UserInfo(BaseModel):
     """
     Schema for returning user information (excluding password).
@@ -78,3 +101,110 @@ class RefreshTokenRequest(BaseModel):
                 "refresh_token": "eyJhbGciOiJIUzI1NiIsInR..."
             }
         }
+
+
+class TokenIntrospectionRequest(BaseModel):
+    """
+    Schema for introspecting a batch of tokens.
+    """
+    tokens: list[str] = Field(..., min_length=1, max_length=100, description="JWT tokens to introspect")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "tokens": ["eyJhbGciOiJIUzI1NiIsInR...", "eyJhbGciOiJIUzI1NiIsInR..."]
+            }
+        }
+
+
+class TokenIntrospection(BaseModel):
+    """
+    Schema for the introspection result of a single token.
+    """
+    active: bool = Field(..., description="Whether the token is valid and its user exists")
+    sub: str | None = Field(None, description="Token subject (user email), only for active tokens")
+    exp: int | None = Field(None, description="Expiry as a Unix timestamp, only for active tokens")
+
+
+class TokenIntrospectionResponse(BaseModel):
+    """
+    Schema for batch token introspection results, in request order.
+    """
+    results: list[TokenIntrospection] = Field(..., description="One result per requested token")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "results": [
+                    {"active": True, "sub": "user@example.com", "exp": 1762555500},
+                    {"active": False, "sub": None, "exp": None}
+                ]
+            }
+        }
+
+
+# ===============================
+# Change feed schemas
+# ===============================
+
+class UserChangeInfo(BaseModel):
+    """
+    Schema for a single change feed entry. ``user`` is the user's current state, or None once deleted.
+    """
+    cursor: str = Field(..., description="Feed cursor just after this change")
+    op: str = Field(..., description="Kind of change: created, updated or deleted")
+    user_id: int = Field(..., description="ID of the changed user")
+    email: EmailStr = Field(..., description="User's email at the time of the change")
+    changed_at: datetime = Field(..., description="Time of the change")
+    user: UserInfo | None = Field(None, description="Current user state, None if the user no longer exists")
+
+
+class UserChangesResponse(BaseModel):
+    """
+    Schema for a page of the user change feed.
+    """
+    changes: list[UserChangeInfo] = Field(..., description="Changes in feed order")
+    next_cursor: str = Field(..., description="Pass as 'since' to fetch the following changes")
+    has_more: bool = Field(..., description="Whether more changes are available right away")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "changes": [
+                    {
+                        "cursor": "41",
+                        "op": "updated",
+                        "user_id": 1,
+                        "email": "user@example.com",
+                        "changed_at": "2025-11-07T21:45:00Z",
+                        "user": {"id": 1, "email": "user@example.com", "full_name": "John Doe", "created_at": "2025-11-07T21:40:00Z"}
+                    },
+                    {
+                        "cursor": "42",
+                        "op": "deleted",
+                        "user_id": 2,
+                        "email": "old@example.com",
+                        "changed_at": "2025-11-07T21:46:00Z",
+                        "user": None
+                    }
+                ],
+                "next_cursor": "42",
+                "has_more": False
+            }
+        }
+
+
+class UserStats(BaseModel):
+    """
+    Schema for user statistics, per shard and in total.
+    """
+    total_users: int = Field(..., description="Number of registered users")
+    users_per_shard: dict[str, int] = Field(..., description="Number of users by shard ID ('default' when not sharded)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "total_users": 3,
+                "users_per_shard": {"0": 2, "1": 1}
+            }
+        }
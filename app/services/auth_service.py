@@ -1,7 +1,15 @@
+from collections import defaultdict
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from app.core.database import dialect_insert, release_connection, scatter_gather, shard_for
 from app.models.user_model import User
-from app.schemas.user_schema import UserCreate, Token
+from app.schemas.user_schema import UserCreate, Token, TokenIntrospection, TokenIntrospectionResponse
+from app.core.activity import activity_tracker
+from app.core.events import event_bus
+from app.core.token_versions import token_versions
+from app.core.tracing import traced
+from app.services.user_service import record_change
 from app.core.security import (
     get_password_hash,
     verify_password,
@@ -10,36 +18,65 @@ from app.core.security import (
     verify_token
 )
 
+def _token_claims(user: User) -> dict:
+    """Build the JWT claims identifying a user; uid, role and ver let get_current_user skip the query in stateless mode."""
+    return {
+        "sub": user.email,
+        "uid": user.id,
+        "role": user.role,
+        "name": user.full_name,
+        "ver": user.token_version,
+    }
+
+
+@traced()
 def register_user(db: Session, user_create: UserCreate) -> User:
-    """Register a new user in the database."""
-    existing_user = db.query(User).filter(User.email == user_create.email).first()
-    if existing_user:
+    """Register a new user with a single INSERT ... ON CONFLICT DO NOTHING RETURNING."""
+    hashed_password = get_password_hash(user_create.password)
+    statement = (
+        dialect_insert(User)
+        .values(
+            email=user_create.email,
+            hashed_password=hashed_password,
+            full_name=user_create.full_name,
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
+    )
+    try:
+        new_user = db.scalars(statement, bind_arguments={"shard_id": shard_for(user_create.email)}).first()
+        if new_user is not None:
+            record_change(db, new_user.id, new_user.email, "created")
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        new_user = None
+    if new_user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
-    hashed_password = get_password_hash(user_create.password)
-    new_user = User(
-        email=user_create.email,
-        hashed_password=hashed_password,
-        full_name=user_create.full_name,
-    )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    # Drop a cached "no such user" left over from a deleted account with this email
+    token_versions.invalidate(new_user.email)
+    event_bus.publish("user.registered", {"id": new_user.id, "email": new_user.email, "full_name": new_user.full_name})
     return new_user
 
 
+@traced()
 def login_user(db: Session, user_create: UserCreate) -> Token:
     """Authenticate user and generate JWT tokens."""
     user = db.query(User).filter(User.email == user_create.email).first()
+    # Don't hold a connection while hashing
+    release_connection(db)
     if not user or not verify_password(user_create.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
         )
-    access_token = create_access_token(data={"sub": user.email})
-    refresh_token = create_refresh_token(data={"sub": user.email})
+    activity_tracker.record_login(user.id, shard_for(user.email))
+    claims = _token_claims(user)
+    access_token = create_access_token(data=claims)
+    refresh_token = create_refresh_token(data=claims)
     return Token(
         access_token=access_token,
         refresh_token=refresh_token,
@@ -47,18 +84,62 @@ def login_user(db: Session, user_create: UserCreate) -> Token:
     )
 
 
-def refresh_tokens(refresh_token: str) -> Token:
-    """Refresh JWT access and refresh tokens using a valid refresh token."""
+def _is_current(payload: dict, user_id: int, token_version: int) -> bool:
+    """Whether a token's ``uid``/``ver`` claims, where present, match the user's current row."""
+    return payload.get("uid", user_id) == user_id and payload.get("ver", token_version) == token_version
+
+
+@traced()
+def refresh_tokens(db: Session, refresh_token: str) -> Token:
+    """Refresh JWT access and refresh tokens, rebuilding their claims from the user's current row."""
     payload = verify_token(refresh_token)
     if not payload or "sub" not in payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
         )
-    new_access_token = create_access_token(data={"sub": payload["sub"]})
-    new_refresh_token = create_refresh_token(data={"sub": payload["sub"]})
+    user = db.query(User).filter(User.email == payload["sub"]).first()
+    release_connection(db)
+    # Deleted, re-registered or revoked since the token was issued
+    if not user or not _is_current(payload, user.id, user.token_version):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
+    claims = _token_claims(user)
+    new_access_token = create_access_token(data=claims)
+    new_refresh_token = create_refresh_token(data=claims)
     return Token(
         access_token=new_access_token,
         refresh_token=new_refresh_token,
         token_type="bearer"
     )
+
+
+@traced()
+def introspect_tokens(db: Session, tokens: list[str]) -> TokenIntrospectionResponse:
+    """Verify a batch of tokens and check that their users exist and they are not revoked, with a single query per shard."""
+    payloads = {token: verify_token(token) for token in set(tokens)}
+    subjects = {payload["sub"] for payload in payloads.values() if payload and "sub" in payload}
+    # One IN query per shard owning any of the subjects, run in parallel
+    subjects_by_shard = defaultdict(list)
+    for subject in subjects:
+        subjects_by_shard[shard_for(subject)].append(subject)
+    versions = {}
+    if subjects_by_shard:
+        for rows in scatter_gather(
+            db,
+            lambda session, shard_id: session.query(User.email, User.id, User.token_version).filter(User.email.in_(subjects_by_shard[shard_id])).all(),
+            shard_ids=list(subjects_by_shard),
+        ):
+            versions.update((email, (user_id, token_version)) for email, user_id, token_version in rows)
+
+    results = []
+    for token in tokens:
+        payload = payloads[token]
+        current = versions.get(payload.get("sub")) if payload else None
+        if current is None or not _is_current(payload, *current):
+            results.append(TokenIntrospection(active=False))
+        else:
+            results.append(TokenIntrospection(active=True, sub=payload["sub"], exp=payload.get("exp")))
+    return TokenIntrospectionResponse(results=results)
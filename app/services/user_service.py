@@ -1,8 +1,39 @@
+import heapq
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from app.core.database import all_shard_ids, engine, scatter_gather, shard_for
 from app.models.user_model import User
+from app.models.user_change_model import UserChange
+from app.schemas.user_schema import UserChangeInfo, UserChangesResponse, UserStats
 from app.core.security import verify_token, get_password_hash, verify_password
+from app.core.token_versions import token_versions
+from app.core.events import event_bus
+from app.core.tracing import traced
 
+# Key of the PostgreSQL advisory lock serializing change log commits (arbitrary; advisory locks are per database, so per shard)
+CHANGE_LOG_LOCK_ID = 0x75736572  # "user"
+_SERIALIZE_CHANGE_LOG = engine.dialect.name == "postgresql"
+
+
+def record_change(db: Session, user_id: int, email: str, op: str) -> None:
+    """
+    Add a change log entry to the session's transaction, to be committed with the change itself.
+
+    Change log IDs are the feed's cursor, so entries must become visible in ID order. PostgreSQL
+    allocates sequence values in call order, not commit order, so the transaction first takes an
+    advisory lock that is held until it ends: the entry's INSERT and the COMMIT then run one
+    writer at a time, after the change's own row locks were taken. SQLite already serializes writers.
+
+    The lock is per database, i.e. per shard, and the ordering has to hold across all users of a
+    shard, so it cannot be narrowed to one user. Call this as the last statement before committing,
+    so the lock is only held for the INSERT and the COMMIT.
+    """
+    if _SERIALIZE_CHANGE_LOG:
+        db.execute(select(func.pg_advisory_xact_lock(CHANGE_LOG_LOCK_ID)), bind_arguments={"shard_id": shard_for(email)})
+    db.add(UserChange(user_id=user_id, email=email, op=op))
+
+@traced()
 def get_user_by_email(db: Session, email: str) -> User:
     """Retrieve a user by their email address."""
     user = db.query(User).filter(User.email == email).first()
@@ -14,29 +45,70 @@ def get_user_by_email(db: Session, email: str) -> User:
     return user
 
 
+@traced()
+def get_user_by_id(db: Session, user_id: int, shard_id: str | None = None) -> User:
+    """Retrieve a user by their ID. IDs are unique per shard, so in sharded mode pass the user's shard."""
+    user = db.get(User, user_id, bind_arguments={"shard_id": shard_id})
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
+
+
+@traced()
 def update_user(db: Session, current_user: User, full_name: str = None, password: str = None) -> User:
-    """Update user's profile fields such as full name and password."""
-    if full_name:
-        current_user.full_name = full_name
-    if password:
-        current_user.hashed_password = get_password_hash(password)
-    
-    db.add(current_user)
+    """Update only the given (non-None) profile fields with a single UPDATE ... RETURNING. A password change revokes existing tokens."""
+    values = {}
+    if full_name is not None:
+        values["full_name"] = full_name
+    if password is not None:
+        values["hashed_password"] = get_password_hash(password)
+        values["token_version"] = User.token_version + 1
+    if not values:
+        return get_user_by_id(db, current_user.id, shard_for(current_user.email))
+
+    updated_user = db.scalars(
+        update(User).where(User.id == current_user.id).values(**values).returning(User),
+        execution_options={"synchronize_session": False, "populate_existing": True},
+        bind_arguments={"shard_id": shard_for(current_user.email)},
+    ).first()
+    if updated_user is not None:
+        record_change(db, updated_user.id, updated_user.email, "updated")
     db.commit()
-    db.refresh(current_user)
-    return current_user
+    if updated_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    if password is not None:
+        token_versions.invalidate(current_user.email)
+    event_bus.publish("user.updated", {
+        "id": updated_user.id,
+        "email": updated_user.email,
+        "full_name": updated_user.full_name,
+        "fields": [field for field, value in (("full_name", full_name), ("password", password)) if value is not None],
+    })
+    return updated_user
 
+@traced()
 def delete_user(db: Session, user: User) -> bool:
-    """Delete a user from the database."""
+    """Delete a user from the database with a single DELETE by primary key."""
     try:
-        db.delete(user)
+        result = db.execute(delete(User).where(User.id == user.id), bind_arguments={"shard_id": shard_for(user.email)})
+        if result.rowcount:
+            record_change(db, user.id, user.email, "deleted")
         db.commit()
+        token_versions.invalidate(user.email)
+        event_bus.publish("user.deleted", {"id": user.id, "email": user.email})
         return True
     except Exception as e:
         db.rollback()
         return False
 
 
+@traced()
 def authenticate_user(db: Session, email: str, password: str) -> User:
     """Authenticate a user using email and password."""
     user = get_user_by_email(db, email)
@@ -48,6 +120,7 @@ def authenticate_user(db: Session, email: str, password: str) -> User:
     return user
 
 
+@traced()
 def get_user_from_token(db: Session, token: str) -> User:
     """Retrieve the currently authenticated user from a JWT token."""
     payload = verify_token(token)
@@ -60,6 +133,74 @@ def get_user_from_token(db: Session, token: str) -> User:
     return get_user_by_email(db, payload["sub"])
 
 
+@traced()
 def list_all_users(db: Session) -> list[User]:
-    """Retrieve a list of all registered users."""
-    return db.query(User).all()
+    """Retrieve a list of all registered users, querying all shards in parallel."""
+    return [user for users in scatter_gather(db, lambda session, shard_id: session.query(User).all()) for user in users]
+
+
+@traced()
+def get_user_stats(db: Session) -> UserStats:
+    """Count users, per shard and in total, querying all shards in parallel."""
+    counts = scatter_gather(db, lambda session, shard_id: (shard_id or "default", session.query(func.count(User.id)).scalar()))
+    return UserStats(total_users=sum(count for _, count in counts), users_per_shard=dict(counts))
+
+
+def _parse_cursor(cursor: str, shard_count: int) -> list[int]:
+    """Decode a change feed cursor: one dot-separated change log position per shard, "0" for the beginning."""
+    try:
+        positions = [int(part) for part in cursor.split(".")]
+    except ValueError:
+        positions = []
+    if positions == [0]:
+        positions = [0] * shard_count
+    if len(positions) != shard_count or any(position < 0 for position in positions):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return positions
+
+
+@traced()
+def list_user_changes(db: Session, since: str = "0", limit: int = 100) -> UserChangesResponse:
+    """
+    Return up to ``limit`` user changes after cursor ``since``, oldest first, each joined with the user's current state.
+
+    Every shard's change log is read from its own position in parallel (one indexed range query per shard)
+    and the results are merged by change time, keeping each shard's own order. The cursor holds one
+    position per shard.
+
+    Entries are committed in ID order on each shard (see ``record_change``), so a reader that resumes
+    from a cursor never skips an entry that committed after its previous page was read.
+    """
+    shard_ids = all_shard_ids()
+    positions = _parse_cursor(since, len(shard_ids))
+
+    def read_shard(session: Session, shard_id: str | None) -> list[tuple[int, UserChange, User | None]]:
+        index = shard_ids.index(shard_id)
+        rows = (
+            session.query(UserChange, User)
+            .outerjoin(User, User.id == UserChange.user_id)
+            .filter(UserChange.id > positions[index])
+            .order_by(UserChange.id)
+            .limit(limit + 1)
+            .all()
+        )
+        return [(index, change, user) for change, user in rows]
+
+    merged = list(heapq.merge(*scatter_gather(db, read_shard), key=lambda row: row[1].changed_at))
+    has_more = len(merged) > limit
+    changes = []
+    for index, change, user in merged[:limit]:
+        positions[index] = change.id
+        changes.append(UserChangeInfo(
+            cursor=".".join(map(str, positions)),
+            op=change.op,
+            user_id=change.user_id,
+            email=change.email,
+            changed_at=change.changed_at,
+            user=user,
+        ))
+    next_cursor = ".".join(map(str, positions))
+    return UserChangesResponse(changes=changes, next_cursor=next_cursor, has_more=has_more)
@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import text
+from app.cli import seed_users as seeding
+from app.core.database import Base, ShardRouter, make_engine
+from app.core.security import verify_password
+
+
+@pytest.fixture
+def engines(tmp_path):
+    engines = {"default": make_engine(f"sqlite:///{tmp_path}/seed.db")}
+    Base.metadata.create_all(bind=engines["default"])
+    yield engines
+    engines["default"].dispose()
+
+
+def _rows(engine):
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT email, full_name, hashed_password FROM users ORDER BY id")).all()
+
+
+@pytest.mark.unit
+class TestSeedUsers:
+
+    def test_synthetic_users_are_deterministic_and_unique(self):
+        # Act
+        users = [seeding.synthetic_user(7, index) for index in range(1000)]
+
+        # Assert
+        assert users == [seeding.synthetic_user(7, index) for index in range(1000)]
+        assert len({email for email, _ in users}) == len(users)
+        assert seeding.synthetic_user(8, 0) != users[0]
+        assert all(email.split("@")[1].startswith("seed7.") for email, _ in users)
+
+    def test_seed_loads_users_with_known_passwords(self, engines):
+        # Arrange
+        progress = []
+
+        # Act
+        loaded = seeding.seed_users(engines, lambda email: None, count=25, seed=3, batch_size=10, distinct_passwords=4,
+                                    progress=lambda done, total, rate: progress.append(done))
+
+        # Assert
+        rows = _rows(engines["default"])
+        assert loaded == 25
+        assert [(email, full_name) for email, full_name, _ in rows] == [seeding.synthetic_user(3, index) for index in range(25)]
+        assert len({hashed for _, _, hashed in rows}) == 4
+        assert verify_password(seeding.password_for(5, 4), rows[5][2])
+        assert progress == [10, 20, 25]
+
+    def test_seed_resumes_after_partial_batch(self, engines):
+        # Arrange
+        seeding.seed_users(engines, lambda email: None, count=20, seed=3, batch_size=10)
+        with engines["default"].begin() as connection:
+            # As if the run had died in the middle of its second batch
+            connection.execute(text("DELETE FROM users WHERE id > 14"))
+
+        # Act
+        loaded = seeding.seed_users(engines, lambda email: None, count=30, seed=3, batch_size=10)
+
+        # Assert
+        assert loaded == 20
+        assert sorted(email for email, _, _ in _rows(engines["default"])) == sorted(seeding.synthetic_user(3, index)[0] for index in range(30))
+        assert seeding.seed_users(engines, lambda email: None, count=30, seed=3, batch_size=10) == 0
+
+    def test_seed_writes_each_user_to_its_shard(self, tmp_path):
+        # Arrange
+        engines = {str(index): make_engine(f"sqlite:///{tmp_path}/shard{index}.db") for index in range(2)}
+        for shard_engine in engines.values():
+            Base.metadata.create_all(bind=shard_engine)
+        router = ShardRouter(engines)
+
+        # Act
+        seeding.seed_users(engines, router.shard_for, count=20, seed=1, batch_size=8)
+
+        # Assert
+        assert seeding.count_seeded(engines, seed=1) == 20
+        for shard_id, shard_engine in engines.items():
+            assert {router.shard_for(email) for email, _, _ in _rows(shard_engine)} == {shard_id}
+        for shard_engine in engines.values():
+            shard_engine.dispose()
@@ -0,0 +1,113 @@
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.activity import ActivityTracker
+from app.core.database import Base
+from app.models.user_model import User
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        db.add_all([User(id=1, email="a@example.com", hashed_password="x"), User(id=2, email="b@example.com", hashed_password="x")])
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+@pytest.mark.unit
+class TestActivityTracker:
+
+    def test_flush_writes_pending_activity_in_one_batch(self, session_factory):
+        # Arrange
+        tracker = ActivityTracker(session_factory, flush_interval=60, write_interval=300)
+        tracker.record_seen(1)
+        tracker.record_login(2)
+
+        # Act
+        written = tracker.flush()
+
+        # Assert
+        assert written == 2
+        assert tracker.pending_count() == 0
+        with session_factory() as db:
+            seen_user, logged_in_user = db.get(User, 1), db.get(User, 2)
+            assert seen_user.last_seen_at is not None
+            assert seen_user.last_login_at is None
+            assert logged_in_user.last_login_at is not None
+            assert logged_in_user.last_seen_at == logged_in_user.last_login_at
+
+    def test_record_seen_is_throttled_per_user(self, session_factory):
+        # Arrange
+        tracker = ActivityTracker(session_factory, flush_interval=60, write_interval=300)
+        tracker.record_seen(1)
+        tracker.flush()
+
+        # Act
+        tracker.record_seen(1)
+
+        # Assert
+        assert tracker.pending_count() == 0
+        assert tracker.flush() == 0
+
+    def test_login_is_recorded_even_when_recently_written(self, session_factory):
+        # Arrange
+        tracker = ActivityTracker(session_factory, flush_interval=60, write_interval=300)
+        tracker.record_seen(1)
+        tracker.flush()
+
+        # Act
+        tracker.record_login(1)
+
+        # Assert
+        assert tracker.pending_count() == 1
+
+    def test_failed_flush_keeps_pending_activity(self):
+        # Arrange
+        failing_factory = MagicMock(side_effect=RuntimeError("DB down"))
+        tracker = ActivityTracker(failing_factory, flush_interval=60, write_interval=300)
+        tracker.record_seen(1)
+
+        # Act & Assert
+        with pytest.raises(RuntimeError):
+            tracker.flush()
+        assert tracker.pending_count() == 1
+
+    def test_flush_ignores_deleted_users(self, session_factory):
+        # Arrange
+        tracker = ActivityTracker(session_factory, flush_interval=60, write_interval=300)
+        tracker.record_seen(1)
+        tracker.record_seen(99)
+
+        # Act
+        written = tracker.flush()
+
+        # Assert
+        assert written == 2
+        with session_factory() as db:
+            assert db.get(User, 1).last_seen_at is not None
+
+    def test_user_deleted_with_pending_activity_does_not_block_flushes(self, session_factory):
+        # Arrange
+        tracker = ActivityTracker(session_factory, flush_interval=60, write_interval=300)
+        tracker.record_seen(1)
+        tracker.record_login(2)
+        with session_factory() as db:
+            db.delete(db.get(User, 2))
+            db.commit()
+
+        # Act
+        written = tracker.flush()
+        tracker.record_login(1)
+        written_next = tracker.flush()
+
+        # Assert
+        assert (written, written_next) == (2, 1)
+        assert tracker.pending_count() == 0
+        with session_factory() as db:
+            assert db.get(User, 1).last_login_at is not None
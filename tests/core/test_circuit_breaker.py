@@ -0,0 +1,249 @@
+import pytest
+import sqlite3
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from unittest.mock import patch
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, attach_circuit_breaker
+from app.core.health import ReadinessProbe
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    clock = FakeClock()
+    with patch("app.core.circuit_breaker.time.monotonic", clock):
+        yield clock
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=3, reset_timeout=10, half_open_max_calls=1)
+
+
+@pytest.fixture
+def outage(breaker, tmp_path):
+    """An engine guarded by ``breaker`` whose new connections fail while ``outage.down`` is set."""
+    class Outage:
+        down = False
+        attempts = 0
+
+    sqlite_engine = create_engine(f"sqlite:///{tmp_path}/breaker.db")
+    attach_circuit_breaker(sqlite_engine, breaker)
+
+    @event.listens_for(sqlite_engine, "do_connect")
+    def _connect(dialect, connection_record, cargs, cparams):
+        Outage.attempts += 1
+        if Outage.down:
+            raise sqlite3.OperationalError("connection refused")
+
+    Outage.engine = sqlite_engine
+    yield Outage
+    sqlite_engine.dispose()
+
+
+def _query(engine):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+@pytest.mark.unit
+class TestCircuitBreaker:
+
+    def test_opens_after_consecutive_failures(self, breaker):
+        # Act
+        for _ in range(3):
+            breaker.record_failure()
+
+        # Assert
+        assert breaker.state == OPEN
+        assert breaker.allow() is False
+        assert breaker.retry_after() == 10
+
+    def test_success_resets_failure_count(self, breaker):
+        # Arrange
+        breaker.record_failure()
+        breaker.record_failure()
+
+        # Act
+        breaker.record_success()
+        breaker.record_failure()
+
+        # Assert
+        assert breaker.state == CLOSED
+        assert breaker.snapshot() == {"state": CLOSED, "consecutive_failures": 1}
+
+    def test_half_open_admits_limited_probes(self, breaker, clock):
+        # Arrange
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now += 10
+
+        # Act
+        first, second = breaker.allow(), breaker.allow()
+
+        # Assert
+        assert breaker.state == HALF_OPEN
+        assert (first, second) == (True, False)
+
+    def test_probe_result_closes_or_reopens(self, breaker, clock):
+        # Arrange
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now += 10
+        breaker.allow()
+
+        # Act
+        breaker.record_failure()
+        reopened = breaker.state
+        clock.now += 10
+        breaker.allow()
+        breaker.record_success()
+
+        # Assert
+        assert reopened == OPEN
+        assert breaker.state == CLOSED
+
+    def test_lost_probe_is_given_up(self, breaker, clock):
+        # Arrange
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now += 10
+        breaker.allow()
+
+        # Act
+        clock.now += 10
+
+        # Assert
+        assert breaker.allow() is True
+
+
+@pytest.mark.unit
+class TestEngineCircuitBreaker:
+
+    def test_connect_failures_open_circuit_and_fail_fast(self, outage, breaker):
+        # Arrange
+        outage.down = True
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                _query(outage.engine)
+
+        # Act
+        with pytest.raises(CircuitOpenError) as error:
+            _query(outage.engine)
+
+        # Assert
+        assert breaker.state == OPEN
+        assert error.value.retry_after == 10
+        assert outage.attempts == 3
+
+    def test_probe_after_recovery_closes_circuit(self, outage, breaker, clock):
+        # Arrange
+        outage.down = True
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                _query(outage.engine)
+        outage.down = False
+        clock.now += 10
+
+        # Act
+        _query(outage.engine)
+
+        # Assert
+        assert breaker.state == CLOSED
+
+    def test_pooled_connections_refused_while_open(self, outage, breaker):
+        # Arrange
+        _query(outage.engine)
+        for _ in range(3):
+            breaker.record_failure()
+
+        # Act / Assert
+        with pytest.raises(CircuitOpenError):
+            _query(outage.engine)
+        assert outage.attempts == 1
+
+    def test_refused_checkout_keeps_pooled_connection(self, outage, breaker, clock):
+        # Arrange
+        _query(outage.engine)
+        for _ in range(3):
+            breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            _query(outage.engine)
+        clock.now += 10
+
+        # Act
+        _query(outage.engine)
+
+        # Assert
+        assert breaker.state == CLOSED
+        assert outage.attempts == 1  # the probe reused the pooled connection instead of reconnecting
+
+    def test_pooled_checkouts_limited_while_half_open(self, outage, breaker, clock):
+        # Arrange
+        connection = outage.engine.connect()
+        connection.close()  # leave a connection in the pool
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now += 10
+
+        # Act
+        probe = outage.engine.connect()
+        with pytest.raises(CircuitOpenError):
+            outage.engine.connect()
+        probe.execute(text("SELECT 1"))
+        probe.close()
+
+        # Assert
+        assert breaker.state == CLOSED
+        assert outage.attempts == 1
+
+    def test_query_errors_do_not_count_as_failures(self, outage, breaker):
+        # Arrange
+        with outage.engine.connect() as connection:
+            for _ in range(5):
+                # Act
+                with pytest.raises(OperationalError):
+                    connection.execute(text("SELECT * FROM missing_table"))
+
+        # Assert
+        assert breaker.snapshot() == {"state": CLOSED, "consecutive_failures": 0}
+
+    def test_readiness_reports_open_circuit(self, outage, breaker):
+        # Arrange
+        probe = ReadinessProbe({"default": outage.engine}, cache_seconds=60, pool_saturation_threshold=0.9, max_activity_backlog=10,
+                               circuit_breakers={"default": breaker})
+        for _ in range(3):
+            breaker.record_failure()
+
+        # Act
+        report = probe.check()
+
+        # Assert
+        assert report["ready"] is False
+        assert report["checks"]["circuit"] == {"ok": False, "state": OPEN, "consecutive_failures": 3}
+        assert report["checks"]["database"] == {"ok": False, "detail": "skipped, circuit open"}
+
+
+@pytest.mark.usefixtures("client")
+class TestCircuitOpenResponse:
+
+    def test_circuit_open_returns_503(self, client: TestClient):
+        # Arrange
+        login_data = {"email": "testuser@example.com", "password": "securepassword123"}
+
+        # Act
+        with patch("app.services.auth_service.login_user", side_effect=CircuitOpenError(retry_after=4.2)):
+            response = client.post("/auth/login", json=login_data)
+
+        # Assert
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+        assert response.json() == {"detail": "Database unavailable, please retry later"}
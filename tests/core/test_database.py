@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi import HTTPException
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.database import Base, LazySession, make_engine, release_connection
+from app.core.dependencies import get_current_user
+from app.models.user_model import User
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path}/lazy.db")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add(User(email="lazy@example.com", hashed_password="hashed", full_name="Lazy User"))
+        session.commit()
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.unit
+class TestLazySession:
+
+    def test_session_is_created_on_first_use(self):
+        # Arrange
+        factory = MagicMock(return_value=MagicMock(spec=Session))
+        db = LazySession(factory)
+
+        # Act
+        db.close()
+        created_before_use = factory.call_count
+        db.query(User)
+        db.query(User)
+
+        # Assert
+        assert created_before_use == 0
+        factory.assert_called_once_with()
+
+    def test_rejected_token_never_creates_session(self):
+        # Arrange
+        factory = MagicMock()
+        db = LazySession(factory)
+
+        with patch("app.core.dependencies.verify_token", return_value=None):
+            # Act
+            with pytest.raises(HTTPException):
+                get_current_user(db=db, token="invalid")
+            db.close()
+
+        # Assert
+        factory.assert_not_called()
+
+    def test_release_connection_returns_connection_and_keeps_objects(self, file_engine):
+        # Arrange
+        db = LazySession(sessionmaker(bind=file_engine, expire_on_commit=False))
+        user = db.query(User).filter(User.email == "lazy@example.com").first()
+        checked_out_while_reading = file_engine.pool.checkedout()
+
+        # Act
+        release_connection(db)
+
+        # Assert
+        assert checked_out_while_reading == 1
+        assert file_engine.pool.checkedout() == 0
+        assert user.full_name == "Lazy User"
+        assert db.query(User).count() == 1
+        db.close()
@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from app.core import dependencies
+from app.core.dependencies import Principal, get_admin_user, get_current_user, require_permissions
+from app.core.permissions import Permission
+from app.models.user_model import User
+
+CLAIMS = {"sub": "test@example.com", "uid": 7, "role": "user", "name": "Test User", "ver": 2}
+
+
+@pytest.mark.unit
+class TestGetCurrentUser:
+
+    def test_stateless_mode_builds_principal_without_user_query(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+
+        with patch("app.core.dependencies.verify_token", return_value=CLAIMS), \
+             patch.object(dependencies.jwt_settings, "stateless_auth", True), \
+             patch("app.core.dependencies.token_versions.get", return_value=(7, 2)):
+            # Act
+            principal = get_current_user(db=mock_db, token="token")
+
+        # Assert
+        assert isinstance(principal, Principal)
+        assert principal.id == 7
+        assert principal.email == "test@example.com"
+        assert principal.full_name == "Test User"
+        mock_db.execute.assert_not_called()
+
+    def test_stateless_mode_rejects_old_token_version(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+
+        with patch("app.core.dependencies.verify_token", return_value=CLAIMS), \
+             patch.object(dependencies.jwt_settings, "stateless_auth", True), \
+             patch("app.core.dependencies.token_versions.get", return_value=(7, 3)):
+            # Act & Assert
+            with pytest.raises(HTTPException) as exc:
+                get_current_user(db=mock_db, token="token")
+            assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+            assert exc.value.detail == "Token has been revoked"
+
+    def test_invalid_token_raises(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+
+        with patch("app.core.dependencies.verify_token", return_value=None):
+            # Act & Assert
+            with pytest.raises(HTTPException) as exc:
+                get_current_user(db=mock_db, token="token")
+            assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.unit
+class TestRequirePermissions:
+
+    def test_admin_role_has_permission(self):
+        # Arrange
+        admin = User(id=1, email="admin@example.com", role="admin")
+        check = require_permissions(Permission.USERS_READ, Permission.USERS_AUDIT)
+
+        # Act
+        result = check(current_user=admin)
+
+        # Assert
+        assert result is admin
+
+    def test_missing_permission_raises_forbidden(self):
+        # Arrange
+        principal = Principal(id=7, email="test@example.com", full_name="Test User", role="user", token_version=2)
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc:
+            get_admin_user(current_user=principal)
+        assert exc.value.status_code == status.HTTP_403_FORBIDDEN
+        assert exc.value.detail == "Insufficient permissions"
+
+    def test_unknown_role_has_no_permissions(self):
+        # Arrange
+        user = User(id=1, email="test@example.com", role="auditor")
+
+        # Act & Assert
+        assert user.permissions == Permission.NONE
+        with pytest.raises(HTTPException):
+            require_permissions(Permission.PROFILES_READ)(current_user=user)
+
+    def test_same_permissions_return_same_dependency(self):
+        # Act & Assert
+        assert require_permissions(Permission.USERS_READ) is require_permissions(Permission.USERS_READ)
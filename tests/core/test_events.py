@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import pytest
+from app.core.events import EventBus, format_sse, stream_events
+
+
+@pytest.mark.unit
+class TestEventBus:
+
+    def test_publish_delivers_to_all_subscribers(self):
+        async def scenario():
+            # Arrange
+            bus = EventBus(buffer_size=10)
+            first, second = bus.subscribe(), bus.subscribe()
+
+            # Act
+            bus.publish("user.registered", {"id": 1})
+            await asyncio.sleep(0)
+
+            # Assert
+            for subscription in (first, second):
+                event = subscription.queue.get_nowait()
+                assert event["type"] == "user.registered"
+                assert event["data"]["id"] == 1
+
+        asyncio.run(scenario())
+
+    def test_publish_from_worker_thread(self):
+        async def scenario():
+            # Arrange
+            bus = EventBus(buffer_size=10)
+            subscription = bus.subscribe()
+
+            # Act
+            thread = threading.Thread(target=bus.publish, args=("user.deleted", {"id": 2}))
+            thread.start()
+            thread.join()
+            event = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+
+            # Assert
+            assert event["type"] == "user.deleted"
+
+        asyncio.run(scenario())
+
+    def test_slow_subscriber_is_dropped(self):
+        async def scenario():
+            # Arrange
+            bus = EventBus(buffer_size=2)
+            slow, fast = bus.subscribe(), bus.subscribe()
+
+            # Act
+            for user_id in range(3):
+                bus.publish("user.updated", {"id": user_id})
+                await asyncio.sleep(0)
+                fast.queue.get_nowait()
+
+            # Assert
+            assert slow.dropped is True
+            assert fast.dropped is False
+            assert bus.subscriber_count() == 1
+
+        asyncio.run(scenario())
+
+    def test_publish_without_subscribers_is_noop(self):
+        # Arrange
+        bus = EventBus(buffer_size=2)
+
+        # Act
+        bus.publish("user.registered", {"id": 1})
+
+        # Assert
+        assert bus.subscriber_count() == 0
+
+    def test_stream_sends_heartbeats_and_events(self):
+        async def scenario():
+            # Arrange
+            bus = EventBus(buffer_size=10)
+            stream = stream_events(bus, heartbeat_seconds=0.01)
+
+            # Act
+            retry = await stream.__anext__()
+            heartbeat = await stream.__anext__()
+            bus.publish("user.registered", {"id": 1})
+            message = await stream.__anext__()
+            await stream.aclose()
+
+            # Assert
+            assert retry.startswith("retry:")
+            assert heartbeat == ": heartbeat\n\n"
+            assert message.startswith("id: 1\nevent: user.registered\ndata: {\"id\": 1")
+            assert bus.subscriber_count() == 0
+
+        asyncio.run(scenario())
+
+    def test_format_sse(self):
+        # Act
+        message = format_sse({"id": 7, "type": "user.deleted", "data": {"id": 3}})
+
+        # Assert
+        assert message == 'id: 7\nevent: user.deleted\ndata: {"id": 3}\n\n'
@@ -0,0 +1,51 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from app.core.health import ReadinessProbe
+
+
+@pytest.fixture
+def sqlite_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.unit
+class TestReadinessProbe:
+
+    def test_check_ready(self, sqlite_engine):
+        # Arrange
+        probe = ReadinessProbe({"default": sqlite_engine}, cache_seconds=60, pool_saturation_threshold=0.9, max_activity_backlog=10)
+
+        # Act
+        report = probe.check()
+
+        # Assert
+        assert report["ready"] is True
+        assert report["checks"]["database"]["ok"] is True
+
+    def test_check_is_cached(self, sqlite_engine):
+        # Arrange
+        probe = ReadinessProbe({"default": sqlite_engine}, cache_seconds=60, pool_saturation_threshold=0.9, max_activity_backlog=10)
+
+        with patch.object(probe, "_check_database", wraps=probe._check_database) as mock_check:
+            # Act
+            probe.check()
+            probe.check()
+
+        # Assert
+        mock_check.assert_called_once()
+
+    def test_check_not_ready_on_activity_backlog(self, sqlite_engine):
+        # Arrange
+        probe = ReadinessProbe({"default": sqlite_engine}, cache_seconds=60, pool_saturation_threshold=0.9, max_activity_backlog=10)
+
+        with patch("app.core.health.activity_tracker.pending_count", return_value=11):
+            # Act
+            report = probe.check()
+
+        # Assert
+        assert report["ready"] is False
+        assert report["checks"]["activity_backlog"]["ok"] is False
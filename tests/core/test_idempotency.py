@@ -0,0 +1,184 @@
+import asyncio
+import uuid
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from app.core.database import Base
+from app.core.idempotency import DatabaseIdempotencyStore, IdempotencyMiddleware, MemoryIdempotencyStore, StoredResponse, idempotency_store
+
+
+def _counting_app(delay: float = 0.0, status_code: int = 201) -> FastAPI:
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/items")
+    async def create_item(request: Request):
+        app.state.calls += 1
+        await asyncio.sleep(delay)
+        return JSONResponse(status_code=status_code, content={"call": app.state.calls, "body": (await request.json())})
+
+    return app
+
+
+def _client(app: FastAPI, store) -> httpx.AsyncClient:
+    wrapped = IdempotencyMiddleware(app, store=store, wait_timeout=5, routes={("POST", "/items")})
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=wrapped), base_url="http://test")
+
+
+@pytest.mark.unit
+class TestIdempotencyStores:
+
+    def test_memory_store_evicts_least_recently_used(self):
+        # Arrange
+        store = MemoryIdempotencyStore(ttl=60, max_entries=2)
+        for key in ("a", "b"):
+            store.put(key, StoredResponse("f", 201, [], key.encode()))
+        store.get("a")
+
+        # Act
+        store.put("c", StoredResponse("f", 201, [], b"c"))
+
+        # Assert
+        assert store.get("b") is None
+        assert store.get("a").body == b"a"
+
+    def test_memory_store_expires_entries(self):
+        # Arrange
+        store = MemoryIdempotencyStore(ttl=0, max_entries=2)
+
+        # Act
+        store.put("a", StoredResponse("f", 201, [], b"a"))
+
+        # Assert
+        assert store.get("a") is None
+
+    def test_database_store_round_trip_and_expiry(self):
+        # Arrange
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        store = DatabaseIdempotencyStore(engine, ttl=60)
+        response = StoredResponse("f", 201, [(b"content-type", b"application/json")], b'{"id": 1}')
+
+        # Act
+        store.put("a", response)
+        store.put("a", response)
+        stored = store.get("a")
+        expired = DatabaseIdempotencyStore(engine, ttl=-1)
+        expired.put("b", response)
+
+        # Assert
+        assert (stored.fingerprint, stored.status_code, stored.headers, stored.body) == ("f", 201, response.headers, response.body)
+        assert expired.get("b") is None
+        engine.dispose()
+
+
+@pytest.mark.unit
+class TestIdempotencyMiddleware:
+
+    def test_retry_is_replayed_without_running_again(self):
+        async def scenario():
+            # Arrange
+            app = _counting_app()
+            async with _client(app, MemoryIdempotencyStore(ttl=60, max_entries=10)) as client:
+                # Act
+                first = await client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k1"})
+                retry = await client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k1"})
+                other_user = await client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k1", "Authorization": "Bearer x"})
+
+            # Assert
+            assert app.state.calls == 2
+            assert retry.status_code == first.status_code == 201
+            assert retry.json() == first.json()
+            assert retry.headers["Idempotent-Replayed"] == "true"
+            assert "Idempotent-Replayed" not in first.headers
+            assert other_user.json()["call"] == 2
+
+        asyncio.run(scenario())
+
+    def test_key_reused_with_different_body_is_rejected(self):
+        async def scenario():
+            # Arrange
+            app = _counting_app()
+            async with _client(app, MemoryIdempotencyStore(ttl=60, max_entries=10)) as client:
+                await client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k1"})
+
+                # Act
+                response = await client.post("/items", json={"name": "b"}, headers={"Idempotency-Key": "k1"})
+
+            # Assert
+            assert response.status_code == 422
+            assert app.state.calls == 1
+
+        asyncio.run(scenario())
+
+    def test_concurrent_duplicates_wait_for_in_flight_request(self):
+        async def scenario():
+            # Arrange
+            app = _counting_app(delay=0.2)
+            async with _client(app, MemoryIdempotencyStore(ttl=60, max_entries=10)) as client:
+                # Act
+                responses = await asyncio.gather(*[
+                    client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k1"}) for _ in range(5)
+                ])
+
+            # Assert
+            assert app.state.calls == 1
+            assert {response.json()["call"] for response in responses} == {1}
+            assert sum(response.headers.get("Idempotent-Replayed") == "true" for response in responses) == 4
+
+        asyncio.run(scenario())
+
+    def test_server_errors_are_not_stored(self):
+        async def scenario():
+            # Arrange
+            app = _counting_app(status_code=503)
+            async with _client(app, MemoryIdempotencyStore(ttl=60, max_entries=10)) as client:
+                # Act
+                await client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k1"})
+                await client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k1"})
+
+            # Assert
+            assert app.state.calls == 2
+
+        asyncio.run(scenario())
+
+
+@pytest.mark.usefixtures("client", "db_session")
+class TestIdempotentRegistration:
+
+    def test_register_retry_replays_created_user(self, client: TestClient):
+        # Arrange
+        user_data = {"email": "retry@example.com", "password": "securepassword123"}
+        headers = {"Idempotency-Key": uuid.uuid4().hex}
+
+        # Act
+        first = client.post("/auth/register", json=user_data, headers=headers)
+        retry = client.post("/auth/register", json=user_data, headers=headers)
+        without_key = client.post("/auth/register", json=user_data)
+
+        # Assert
+        assert first.status_code == retry.status_code == 201
+        assert retry.json() == first.json()
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert without_key.status_code == 400
+
+    def test_token_endpoints_are_never_stored(self, client: TestClient):
+        # Arrange
+        user_data = {"email": "tokens@example.com", "password": "securepassword123"}
+        client.post("/auth/register", json=user_data)
+        headers = {"Idempotency-Key": uuid.uuid4().hex}
+
+        with patch.object(idempotency_store, "put") as mock_put:
+            # Act
+            first = client.post("/auth/login", json=user_data, headers=headers)
+            retry = client.post("/auth/login", json=user_data, headers=headers)
+
+        # Assert
+        assert first.status_code == retry.status_code == 200
+        assert "Idempotent-Replayed" not in retry.headers
+        mock_put.assert_not_called()
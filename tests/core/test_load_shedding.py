@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.load_shedding import ConcurrencyLimiter, LoadSheddingMiddleware, Priority
+
+
+@pytest.mark.unit
+class TestConcurrencyLimiter:
+
+    def test_acquire_within_limits(self):
+        # Arrange
+        limiter = ConcurrencyLimiter(max_in_flight=2, max_queue=2, queue_timeout=1, route_limits={})
+
+        async def scenario():
+            return [await limiter.acquire("GET /users/me", Priority.HIGH) for _ in range(2)]
+
+        # Act
+        admitted = asyncio.run(scenario())
+
+        # Assert
+        assert admitted == [True, True]
+        assert limiter.in_flight == 2
+
+    def test_waiters_are_admitted_by_priority(self):
+        # Arrange
+        limiter = ConcurrencyLimiter(max_in_flight=1, max_queue=4, queue_timeout=1, route_limits={})
+        order = []
+
+        async def request(route, priority):
+            if await limiter.acquire(route, priority):
+                order.append(route)
+                await asyncio.sleep(0)
+                limiter.release(route)
+
+        async def scenario():
+            await limiter.acquire("GET /", Priority.NORMAL)
+            tasks = [
+                asyncio.create_task(request("GET /users/", Priority.LOW)),
+                asyncio.create_task(request("POST /auth/refresh", Priority.CRITICAL)),
+            ]
+            await asyncio.sleep(0)
+            limiter.release("GET /")
+            await asyncio.gather(*tasks)
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert order == ["POST /auth/refresh", "GET /users/"]
+
+    def test_full_queue_sheds_lower_priority(self):
+        # Arrange
+        limiter = ConcurrencyLimiter(max_in_flight=1, max_queue=1, queue_timeout=1, route_limits={})
+
+        async def scenario():
+            await limiter.acquire("GET /", Priority.NORMAL)
+            low = asyncio.create_task(limiter.acquire("GET /users/", Priority.LOW))
+            await asyncio.sleep(0)
+            high = asyncio.create_task(limiter.acquire("GET /users/me", Priority.HIGH))
+            await asyncio.sleep(0)
+            rejected = await limiter.acquire("POST /auth/register", Priority.LOW)
+            limiter.release("GET /")
+            return await low, await high, rejected
+
+        # Act
+        low, high, rejected = asyncio.run(scenario())
+
+        # Assert
+        assert low is False
+        assert high is True
+        assert rejected is False
+
+    def test_route_limit_and_queue_timeout(self):
+        # Arrange
+        limiter = ConcurrencyLimiter(max_in_flight=10, max_queue=10, queue_timeout=0.01, route_limits={"GET /users/": 1})
+
+        async def scenario():
+            first = await limiter.acquire("GET /users/", Priority.LOW)
+            second = await limiter.acquire("GET /users/", Priority.LOW)
+            other = await limiter.acquire("GET /users/me", Priority.HIGH)
+            return first, second, other
+
+        # Act
+        first, second, other = asyncio.run(scenario())
+
+        # Assert
+        assert (first, second, other) == (True, False, True)
+        assert limiter.queued == 0
+
+
+@pytest.mark.unit
+class TestLoadSheddingMiddleware:
+
+    def test_shed_request_returns_503(self):
+        # Arrange
+        limiter = ConcurrencyLimiter(max_in_flight=0, max_queue=0, queue_timeout=0, route_limits={})
+        app = FastAPI()
+        app.add_middleware(LoadSheddingMiddleware, limiter=limiter, route_priorities={})
+
+        @app.get("/healthz")
+        def healthz():
+            return {"status": "ok"}
+
+        @app.get("/work")
+        def work():
+            return {"done": True}
+
+        client = TestClient(app)
+
+        # Act
+        shed = client.get("/work")
+        exempt = client.get("/healthz")
+
+        # Assert
+        assert shed.status_code == 503
+        assert shed.headers["Retry-After"] == "1"
+        assert exempt.status_code == 200
@@ -0,0 +1,171 @@
+import pytest
+import time
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from app.core.config import ProfilingSettings
+from app.core.profiling import PROFILE_ID_HEADER, ProfileStore, ProfilingMiddleware, can_trigger_profiling, new_profile_id
+from app.core.security import create_access_token, get_password_hash
+
+SECRET = "profile-secret"
+ADMIN_TOKEN = "admin-token"
+TRIGGER = {"X-Profile": SECRET, "Authorization": f"Bearer {ADMIN_TOKEN}"}
+
+
+def _make_client(store: ProfileStore, secret: str = SECRET, sample_rate: float = 0.0) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, secret=secret, sample_rate=sample_rate, sample_interval=0.001,
+                       trace_memory=False, authorize=lambda token: token == ADMIN_TOKEN)
+
+    @app.get("/work")
+    def work() -> dict:
+        # Spend time in application code, so the sampler has app frames to record
+        deadline = time.monotonic() + 0.1
+        while time.monotonic() < deadline:
+            get_password_hash("password")
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+@pytest.mark.unit
+class TestProfileStore:
+
+    def test_save_keeps_only_newest_profiles(self, tmp_path):
+        # Arrange
+        store = ProfileStore(str(tmp_path), max_profiles=2)
+
+        # Act
+        for profile_id in ["20250101T000000Z-GET-a-1", "20250101T000001Z-GET-a-2", "20250101T000002Z-GET-a-3"]:
+            store.save(profile_id, {".folded": "main 1\n", ".alloc.txt": "peak\n"})
+
+        # Assert
+        names = [file["name"] for file in store.list()]
+        assert len(names) == 4
+        assert not any(name.startswith("20250101T000000Z") for name in names)
+
+    def test_store_rejects_unbounded_ring(self, tmp_path):
+        # Act & Assert
+        with pytest.raises(ValueError):
+            ProfileStore(str(tmp_path), max_profiles=0)
+        with pytest.raises(ValidationError):
+            ProfilingSettings(profiling_max_profiles=0)
+
+    def test_path_for_rejects_unknown_and_traversal_names(self, tmp_path):
+        # Arrange
+        store = ProfileStore(str(tmp_path), max_profiles=2)
+        store.save("20250101T000000Z-GET-a-1", {".folded": "main 1\n"})
+
+        # Act & Assert
+        assert store.path_for("20250101T000000Z-GET-a-1.folded") is not None
+        assert store.path_for("missing.folded") is None
+        assert store.path_for("../secrets.txt") is None
+        assert store.path_for("x.folded/../../secrets.txt") is None
+
+    def test_new_profile_id_is_filesystem_safe(self):
+        # Act
+        profile_id = new_profile_id("GET", "/users/me")
+
+        # Assert
+        assert "/" not in profile_id
+        assert "-GET-users_me-" in profile_id
+
+
+@pytest.mark.unit
+class TestProfilingMiddleware:
+
+    def test_secret_header_writes_folded_profile(self, tmp_path):
+        # Arrange
+        store = ProfileStore(str(tmp_path), max_profiles=10)
+
+        # Act
+        with _make_client(store) as client:
+            response = client.get("/work", headers=TRIGGER)
+
+        # Assert
+        assert response.status_code == 200
+        profile_id = response.headers[PROFILE_ID_HEADER]
+        assert [file["name"] for file in store.list()] == [f"{profile_id}.folded"]
+        folded = store.path_for(f"{profile_id}.folded").read_text()
+        assert "get_password_hash (security.py:" in folded
+
+    @pytest.mark.parametrize("secret, headers", [
+        (SECRET, {**TRIGGER, "X-Profile": "wrong-secret"}),
+        ("", {**TRIGGER, "X-Profile": ""}),
+        (SECRET, {"X-Profile": SECRET}),
+        (SECRET, {**TRIGGER, "Authorization": "Bearer user-token"}),
+    ])
+    def test_untrusted_trigger_profiles_nothing(self, tmp_path, secret, headers):
+        # Arrange
+        store = ProfileStore(str(tmp_path), max_profiles=10)
+
+        # Act
+        with _make_client(store, secret=secret) as client:
+            response = client.get("/work", headers=headers)
+
+        # Assert
+        assert response.status_code == 200
+        assert PROFILE_ID_HEADER not in response.headers
+        assert store.list() == []
+
+    def test_memory_header_adds_allocation_report(self, tmp_path):
+        # Arrange
+        store = ProfileStore(str(tmp_path), max_profiles=10)
+
+        # Act
+        with _make_client(store) as client:
+            response = client.get("/work", headers={**TRIGGER, "X-Profile-Memory": "1"})
+
+        # Assert
+        profile_id = response.headers[PROFILE_ID_HEADER]
+        assert sorted(file["name"] for file in store.list()) == [f"{profile_id}.alloc.txt", f"{profile_id}.folded"]
+        assert store.path_for(f"{profile_id}.alloc.txt").read_text().startswith("peak traced memory:")
+
+    def test_middleware_keeps_only_newest_profiles(self, tmp_path):
+        # Arrange
+        store = ProfileStore(str(tmp_path), max_profiles=2)
+
+        # Act
+        with _make_client(store) as client:
+            profile_ids = [client.get("/work", headers=TRIGGER).headers[PROFILE_ID_HEADER] for _ in range(3)]
+
+        # Assert
+        assert sorted(file["name"] for file in store.list()) == sorted(f"{profile_id}.folded" for profile_id in profile_ids[1:])
+
+    def test_sampled_request_does_not_expose_profile_id(self, tmp_path):
+        # Arrange
+        store = ProfileStore(str(tmp_path), max_profiles=10)
+
+        # Act
+        with _make_client(store, sample_rate=1.0) as client:
+            response = client.get("/work")
+
+        # Assert
+        assert PROFILE_ID_HEADER not in response.headers
+        assert len(store.list()) == 1
+
+
+@pytest.mark.unit
+class TestCanTriggerProfiling:
+
+    @pytest.mark.parametrize("role, current, allowed", [
+        ("admin", (1, 0), True),
+        ("user", (1, 0), False),
+        ("admin", (1, 1), False),
+        ("admin", None, False),
+    ])
+    def test_requires_current_token_with_profiles_permission(self, role, current, allowed):
+        # Arrange
+        token = create_access_token({"sub": "admin@example.com", "uid": 1, "role": role, "name": None, "ver": 0})
+
+        # Act
+        with patch("app.core.profiling.token_versions.get", return_value=current):
+            result = can_trigger_profiling(token)
+
+        # Assert
+        assert result is allowed
+
+    def test_rejects_invalid_token(self):
+        # Act & Assert
+        assert can_trigger_profiling("not-a-token") is False
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import inspect, select, text
+from sqlalchemy.orm import Session
+from app.core.database import make_engine
+from app.core.schema import upgrade_schema
+from app.models.user_model import User
+
+# The users table as first released, before any column was added to it
+BASELINE_USERS_TABLE = """
+CREATE TABLE users (
+    id INTEGER NOT NULL PRIMARY KEY,
+    email VARCHAR NOT NULL UNIQUE,
+    hashed_password VARCHAR NOT NULL,
+    full_name VARCHAR,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP)
+)
+"""
+
+
+@pytest.fixture
+def baseline_engine(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path}/baseline.db")
+    with engine.begin() as connection:
+        connection.execute(text(BASELINE_USERS_TABLE))
+        connection.execute(text("INSERT INTO users (email, hashed_password, full_name) VALUES ('old@example.com', 'hashed', 'Old User')"))
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.unit
+class TestUpgradeSchema:
+
+    def test_adds_missing_columns_to_existing_table(self, baseline_engine):
+        # Act
+        added = upgrade_schema(baseline_engine)
+
+        # Assert
+        assert {"users.last_login_at", "users.last_seen_at"} <= set(added)
+        assert {"user_changes", "idempotency_keys"} <= set(inspect(baseline_engine).get_table_names())
+        with Session(baseline_engine) as session:
+            user = session.scalars(select(User).where(User.email == "old@example.com")).one()
+            assert (user.full_name, user.last_login_at, user.last_seen_at) == ("Old User", None, None)
+
+    def test_not_null_columns_get_their_server_default(self, baseline_engine):
+        # Act
+        added = upgrade_schema(baseline_engine)
+
+        # Assert
+        assert {"users.role", "users.token_version"} <= set(added)
+        with Session(baseline_engine) as session:
+            user = session.scalars(select(User).where(User.email == "old@example.com")).one()
+            assert (user.role, user.token_version) == ("user", 0)
+
+    def test_is_a_no_op_on_an_upgraded_database(self, baseline_engine):
+        # Arrange
+        upgrade_schema(baseline_engine)
+
+        # Act
+        added = upgrade_schema(baseline_engine)
+
+        # Assert
+        assert added == []
@@ -0,0 +1,188 @@
+import pytest
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import event, text
+from app.core import database
+from app.core.activity import ActivityTracker
+from app.core.database import Base, ShardRouter, make_engine
+from app.core.dependencies import get_current_user
+from app.core.security import create_access_token
+from app.schemas.user_schema import UserCreate
+from app.services import auth_service, user_service
+
+EMAILS = [f"user{index}@example.com" for index in range(12)]
+
+
+@pytest.fixture
+def router(tmp_path, monkeypatch):
+    engines = {str(index): make_engine(f"sqlite:///{tmp_path}/shard{index}.db") for index in range(3)}
+    for shard_engine in engines.values():
+        Base.metadata.create_all(bind=shard_engine)
+    router = ShardRouter(engines)
+    monkeypatch.setattr(database, "shard_router", router)
+    yield router
+    for shard_engine in engines.values():
+        shard_engine.dispose()
+
+
+@pytest.fixture
+def db(router):
+    with router.session_factory(autoflush=False, expire_on_commit=False)() as session:
+        yield session
+
+
+@pytest.fixture
+def statements(router):
+    """Count the statements run on each shard."""
+    counts = Counter()
+    for shard_id, shard_engine in router.engines.items():
+        event.listen(shard_engine, "before_cursor_execute", lambda *args, shard_id=shard_id: counts.update([shard_id]))
+    return counts
+
+
+def _register_all(db):
+    with pytest.MonkeyPatch.context() as patcher:
+        patcher.setattr(auth_service, "get_password_hash", lambda password: "hashed_" + password)
+        for email in EMAILS:
+            auth_service.register_user(db, UserCreate(email=email, password="secret", full_name="Sharded User"))
+
+
+def _emails_on(router, shard_id):
+    with router.engines[shard_id].connect() as connection:
+        return {row[0] for row in connection.execute(text("SELECT email FROM users"))}
+
+
+@pytest.mark.unit
+class TestSharding:
+
+    def test_shard_for_is_stable_and_spreads_users(self, router):
+        # Act
+        shards = [router.shard_for(email) for email in EMAILS]
+
+        # Assert
+        assert shards == [router.shard_for(email) for email in EMAILS]
+        assert router.shard_for("User0@Example.com") == router.shard_for("user0@example.com")
+        assert set(shards) == {"0", "1", "2"}
+
+    def test_register_writes_only_to_owning_shard(self, router, db):
+        # Act
+        _register_all(db)
+
+        # Assert
+        for shard_id in router.shard_ids:
+            assert _emails_on(router, shard_id) == {email for email in EMAILS if router.shard_for(email) == shard_id}
+
+    def test_lookups_by_email_hit_one_shard(self, router, db, statements):
+        # Arrange
+        _register_all(db)
+        email = EMAILS[0]
+        statements.clear()
+
+        # Act
+        current_user = get_current_user(db=db, token=create_access_token(data={"sub": email}))
+        user = user_service.get_user_by_email(db, email)
+
+        # Assert
+        assert user.email == current_user.email == email
+        assert set(statements) == {router.shard_for(email)}
+
+    def test_list_and_stats_gather_all_shards(self, router, db):
+        # Arrange
+        _register_all(db)
+
+        # Act
+        users = user_service.list_all_users(db)
+        stats = user_service.get_user_stats(db)
+
+        # Assert
+        assert sorted(user.email for user in users) == sorted(EMAILS)
+        assert stats.total_users == len(EMAILS)
+        assert stats.users_per_shard == {shard_id: len(_emails_on(router, shard_id)) for shard_id in router.shard_ids}
+
+    def test_update_and_delete_touch_only_owning_shard(self, router, db):
+        # Arrange
+        _register_all(db)
+        first, second = (user_service.get_user_by_email(db, email) for email in EMAILS[:2])
+        # Rows with the same ID on other shards must not be touched
+        assert any(user.id == first.id for user in user_service.list_all_users(db) if user.email != first.email)
+
+        # Act
+        updated = user_service.update_user(db, first, full_name="Renamed")
+        deleted = user_service.delete_user(db, second)
+
+        # Assert
+        assert updated.full_name == "Renamed"
+        assert deleted is True
+        names = {user.email: user.full_name for user in user_service.list_all_users(db)}
+        assert names[first.email] == "Renamed"
+        assert second.email not in names
+        assert sum(name == "Renamed" for name in names.values()) == 1
+        assert len(names) == len(EMAILS) - 1
+
+    def test_change_feed_pages_across_shards(self, router, db):
+        # Arrange
+        _register_all(db)
+        user_service.delete_user(db, user_service.get_user_by_email(db, EMAILS[0]))
+
+        # Act
+        seen, cursor, has_more = [], "0", True
+        while has_more:
+            page = user_service.list_user_changes(db, since=cursor, limit=5)
+            seen.extend((change.op, change.email) for change in page.changes)
+            cursor, has_more = page.next_cursor, page.has_more
+        resumed = user_service.list_user_changes(db, since=cursor)
+
+        # Assert
+        assert sorted(seen) == sorted([("created", email) for email in EMAILS] + [("deleted", EMAILS[0])])
+        assert seen.index(("created", EMAILS[0])) < seen.index(("deleted", EMAILS[0]))
+        assert len(cursor.split(".")) == 3
+        assert resumed.changes == []
+
+    def test_introspect_tokens_queries_owning_shards(self, router, db, statements):
+        # Arrange
+        _register_all(db)
+        tokens = [create_access_token(data={"sub": email}) for email in EMAILS[:2]]
+        tokens.append(create_access_token(data={"sub": "missing@example.com"}))
+        statements.clear()
+
+        # Act
+        response = auth_service.introspect_tokens(db, tokens)
+
+        # Assert
+        assert [result.active for result in response.results] == [True, True, False]
+        assert set(statements) == {router.shard_for(email) for email in EMAILS[:2] + ["missing@example.com"]}
+
+    def test_activity_flush_writes_each_shard(self, router, db):
+        # Arrange
+        _register_all(db)
+        tracker = ActivityTracker(router.session_factory(autoflush=False), flush_interval=60, write_interval=300)
+        users = [user_service.get_user_by_email(db, email) for email in EMAILS]
+        for user in users:
+            tracker.record_seen(user.id, router.shard_for(user.email))
+        db.rollback()  # end the read transactions, SQLite blocks writers while they are open
+
+        # Act
+        written = tracker.flush()
+
+        # Assert
+        assert written == len(EMAILS)
+        db.expire_all()
+        assert all(user.last_seen_at is not None for user in user_service.list_all_users(db))
+
+    def test_concurrent_gathers_run_in_parallel(self, router):
+        # Arrange
+        concurrent_router = ShardRouter(router.engines, gather_concurrency=2)
+        # Every shard query of both gathers must be running at once to pass the barrier
+        barrier = threading.Barrier(2 * len(router.shard_ids), timeout=5)
+
+        def gather() -> list[int]:
+            return concurrent_router.scatter_gather(lambda session, shard_id: barrier.wait())
+
+        # Act
+        with ThreadPoolExecutor(max_workers=2) as callers:
+            results = [future.result() for future in [callers.submit(gather), callers.submit(gather)]]
+
+        # Assert
+        assert [len(result) for result in results] == [3, 3]
+        assert not barrier.broken
@@ -0,0 +1,73 @@
+import threading
+import time
+import pytest
+from app.core.singleflight import SingleFlight
+
+
+@pytest.mark.unit
+class TestSingleFlight:
+
+    def test_concurrent_calls_share_one_execution(self):
+        # Arrange
+        flight = SingleFlight(timeout=5)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def lookup():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"email": "test@example.com"}
+
+        threads = [threading.Thread(target=lambda: results.append(flight.do("test@example.com", lookup))) for _ in range(10)]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        time.sleep(0.1)  # let the other callers reach the wait
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        assert len(calls) == 1
+        assert results == [{"email": "test@example.com"}] * 10
+        assert flight.in_flight() == 0
+
+    def test_error_is_shared_and_not_cached(self):
+        # Arrange
+        flight = SingleFlight(timeout=5)
+
+        def failing_lookup():
+            raise RuntimeError("DB error")
+
+        # Act & Assert
+        with pytest.raises(RuntimeError):
+            flight.do("key", failing_lookup)
+        assert flight.do("key", lambda: "ok") == "ok"
+
+    def test_waiter_runs_itself_after_timeout(self):
+        # Arrange
+        flight = SingleFlight(timeout=5)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_lookup():
+            started.set()
+            release.wait(5)
+            return "leader"
+
+        leader = threading.Thread(target=lambda: flight.do("key", slow_lookup))
+        leader.start()
+        started.wait(5)
+
+        # Act
+        result = flight.do("key", lambda: "follower", timeout=0.01)
+        release.set()
+        leader.join()
+
+        # Assert
+        assert result == "follower"
@@ -0,0 +1,47 @@
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+from app.core.token_versions import TokenVersionCache
+
+
+def _db_returning(*rows) -> MagicMock:
+    db = MagicMock(spec=Session)
+    db.query.return_value.filter.return_value.first.side_effect = list(rows)
+    return db
+
+
+@pytest.mark.unit
+class TestTokenVersionCache:
+
+    def test_get_caches_loaded_version(self):
+        # Arrange
+        cache = TokenVersionCache(ttl=60, max_entries=10)
+        db = _db_returning((7, 0))
+
+        # Act
+        first, second = cache.get(db, "user@example.com"), cache.get(db, "user@example.com")
+
+        # Assert
+        assert first == second == (7, 0)
+        assert db.query.call_count == 1
+
+    def test_invalidate_during_load_does_not_cache_old_version(self):
+        # Arrange
+        cache = TokenVersionCache(ttl=60, max_entries=10)
+        db = MagicMock(spec=Session)
+
+        def load_then_revoke():
+            # The token version is bumped and invalidated after this reader loaded the old one
+            db.query.return_value.filter.return_value.first.side_effect = [(7, 1)]
+            cache.invalidate("user@example.com")
+            return (7, 0)
+
+        db.query.return_value.filter.return_value.first.side_effect = load_then_revoke
+
+        # Act
+        raced = cache.get(db, "user@example.com")
+        after = cache.get(db, "user@example.com")
+
+        # Assert
+        assert raced == (7, 0)
+        assert after == (7, 1)
@@ -0,0 +1,116 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.core.tracing import FileSpanExporter, Span, Trace, Tracer, to_otlp, tracer
+
+
+@pytest.fixture
+def sampled(monkeypatch):
+    """Trace every request into the in-memory exporter."""
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    tracer.exporter.clear()
+    yield tracer.exporter
+    tracer.exporter.clear()
+
+
+def _children(spans, parent):
+    return [span for span in spans if span.parent_span_id == parent.span_id]
+
+
+@pytest.mark.unit
+class TestTracer:
+
+    def test_should_sample_ratio(self):
+        # Arrange
+        low, high = "0" * 32, "0" * 16 + "f" * 16
+
+        # Act & Assert
+        assert Tracer(exporter=None, sample_rate=0.0).should_sample(low) is False
+        assert Tracer(exporter=None, sample_rate=1.0).should_sample(high) is True
+        assert Tracer(exporter=None, sample_rate=0.5).should_sample(low) is True
+        assert Tracer(exporter=None, sample_rate=0.5).should_sample(high) is False
+
+    def test_spans_are_noop_outside_sampled_request(self):
+        # Act
+        with tracer.span("outside") as span:
+            pass
+
+        # Assert
+        assert span is None
+
+    def test_file_exporter_writes_otlp_json_lines(self, tmp_path):
+        # Arrange
+        exporter = FileSpanExporter(str(tmp_path / "traces" / "spans.jsonl"), service_name="test-service")
+        trace = Trace("a" * 32)
+        root = Span(trace, "GET /", None, 2, {"http.response.status_code": 200})
+        child = Span(trace, "db.query", root.span_id, 3, {"db.statement": "SELECT 1"})
+        child.end()
+        root.end()
+
+        # Act
+        exporter.export(trace.spans)
+        exporter.export(trace.spans)
+
+        # Assert
+        lines = (tmp_path / "traces" / "spans.jsonl").read_text().splitlines()
+        assert len(lines) == 2
+        payload = json.loads(lines[0])
+        assert payload == to_otlp(trace.spans, "test-service")
+        resource_spans = payload["resourceSpans"][0]
+        assert resource_spans["resource"]["attributes"][0] == {"key": "service.name", "value": {"stringValue": "test-service"}}
+        spans = resource_spans["scopeSpans"][0]["spans"]
+        assert spans[0]["parentSpanId"] == root.span_id
+        assert "parentSpanId" not in spans[1]
+        assert spans[1]["attributes"] == [{"key": "http.response.status_code", "value": {"intValue": "200"}}]
+
+
+@pytest.mark.usefixtures("client")
+class TestTracingMiddleware:
+
+    def test_request_id_is_assigned_without_sampling(self, client: TestClient):
+        # Act
+        response = client.get("/healthz")
+        echoed = client.get("/healthz", headers={"X-Request-ID": "abc-123"})
+
+        # Assert
+        assert len(response.headers["X-Request-ID"]) == 32
+        assert echoed.headers["X-Request-ID"] == "abc-123"
+        assert tracer.exporter.get_finished_spans() == []
+
+    def test_traceparent_continues_sampled_trace(self, client: TestClient, sampled):
+        # Arrange
+        traceparent = "00-" + "1" * 32 + "-" + "2" * 16 + "-01"
+
+        # Act
+        client.get("/healthz", headers={"traceparent": traceparent})
+
+        # Assert
+        root = next(span for span in sampled.get_finished_spans() if span.name == "GET /healthz")
+        assert root.trace.trace_id == "1" * 32
+        assert root.parent_span_id == "2" * 16
+
+    @pytest.mark.usefixtures("db_session")
+    def test_login_spans_are_nested(self, client: TestClient, sampled):
+        # Arrange
+        user_data = {"email": "traced@example.com", "password": "securepassword123"}
+        client.post("/auth/register", json=user_data)
+        sampled.clear()
+
+        # Act
+        response = client.post("/auth/login", json=user_data)
+
+        # Assert
+        spans = sampled.get_finished_spans()
+        root = next(span for span in spans if span.parent_span_id is None)
+        assert root.name == "POST /auth/login"
+        assert root.attributes["request.id"] == response.headers["X-Request-ID"]
+        assert root.attributes["http.response.status_code"] == 200
+        [route] = _children(spans, root)
+        assert route.name == "route login"
+        [service] = _children(spans, route)
+        assert service.name == "auth_service.login_user"
+        names = [span.name for span in _children(spans, service)]
+        assert names[0] == "db.query"
+        assert "argon2.verify" in names
+        assert names.count("jwt.encode") == 2
+        assert all(span.trace is root.trace for span in spans)
@@ -0,0 +1,43 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch, MagicMock
+from app.core.dependencies import require_permissions
+from app.core.permissions import Permission
+
+@pytest.mark.usefixtures("client")
+class TestAdminRoute:
+
+    def test_list_profiles_success_admin(self, client: TestClient):
+        # Arrange
+        mock_admin = MagicMock()
+        mock_admin.role = "admin"
+        profiles = [{"name": "20251107T214500000000Z-GET-users_me-1a2b3c4d.folded", "size": 10, "created_at": "2025-11-07T21:45:00Z"}]
+
+        client.app.dependency_overrides[require_permissions(Permission.PROFILES_READ)] = lambda: mock_admin
+
+        with patch("app.routes.admin_route.profile_store.list", return_value=profiles):
+            # Act
+            response = client.get("/admin/profiles")
+
+            # Assert
+            assert response.status_code == 200
+            assert response.json() == profiles
+
+        client.app.dependency_overrides.clear()
+
+    def test_download_profile_not_found(self, client: TestClient):
+        # Arrange
+        mock_admin = MagicMock()
+        mock_admin.role = "admin"
+
+        client.app.dependency_overrides[require_permissions(Permission.PROFILES_READ)] = lambda: mock_admin
+
+        with patch("app.routes.admin_route.profile_store.path_for", return_value=None):
+            # Act
+            response = client.get("/admin/profiles/missing.folded")
+
+            # Assert
+            assert response.status_code == 404
+            assert response.json() == {"detail": "Profile not found"}
+
+        client.app.dependency_overrides.clear()
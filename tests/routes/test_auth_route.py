@@ -1,6 +1,18 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
+from app.core import dependencies
+from app.core.dependencies import get_current_user, require_permissions
+from app.core.permissions import Permission
+from app.models.user_model import User
+
+
+@pytest.fixture
+def as_service(client: TestClient):
+    """Authenticate requests as a service allowed to introspect tokens."""
+    client.app.dependency_overrides[require_permissions(Permission.TOKENS_INTROSPECT)] = lambda: MagicMock(role="service")
+    yield
+    client.app.dependency_overrides.pop(require_permissions(Permission.TOKENS_INTROSPECT), None)
 
 @pytest.mark.usefixtures("client")
 class TestAuthRoute:
@@ -94,3 +106,138 @@ class TestAuthRoute:
 
         # Assert
         assert response.status_code == 422
+
+    @pytest.mark.usefixtures("as_service")
+    def test_introspect_tokens_success(self, client: TestClient):
+        # Arrange
+        request_data = {"tokens": ["fake_access_token", "expired_token"]}
+
+        expected_response = {
+            "results": [
+                {"active": True, "sub": "testuser@example.com", "exp": 1762555500},
+                {"active": False, "sub": None, "exp": None}
+            ]
+        }
+
+        # Act
+        with patch("app.services.auth_service.introspect_tokens", return_value=expected_response):
+            response = client.post("/auth/introspect", json=request_data)
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json() == expected_response
+
+    @pytest.mark.usefixtures("as_service")
+    def test_introspect_empty_batch(self, client: TestClient):
+        # Act
+        response = client.post("/auth/introspect", json={"tokens": []})
+
+        # Assert
+        assert response.status_code == 422
+
+    def test_introspect_requires_authentication(self, client: TestClient):
+        # Act
+        response = client.post("/auth/introspect", json={"tokens": ["fake_access_token"]})
+
+        # Assert
+        assert response.status_code == 401
+
+    def test_introspect_forbidden_for_regular_user(self, client: TestClient):
+        # Arrange
+        client.app.dependency_overrides[get_current_user] = lambda: User(id=1, email="testuser@example.com", role="user")
+
+        # Act
+        with patch("app.services.auth_service.introspect_tokens") as mock_introspect:
+            response = client.post("/auth/introspect", json={"tokens": ["fake_access_token"]})
+        client.app.dependency_overrides.pop(get_current_user)
+
+        # Assert
+        assert response.status_code == 403
+        mock_introspect.assert_not_called()
+
+
+@pytest.mark.usefixtures("client", "db_session")
+class TestAuthFlow:
+
+    def test_register_login_and_read_profile(self, client: TestClient):
+        # Arrange
+        user_data = {
+            "email": "flow@example.com",
+            "password": "securepassword123",
+            "full_name": "Flow User"
+        }
+
+        # Act
+        register_response = client.post("/auth/register", json=user_data)
+        duplicate_response = client.post("/auth/register", json=user_data)
+        login_response = client.post("/auth/login", json=user_data)
+        access_token = login_response.json()["access_token"]
+        me_response = client.get("/users/me", headers={"Authorization": f"Bearer {access_token}"})
+
+        # Assert
+        assert register_response.status_code == 201
+        assert duplicate_response.status_code == 400
+        assert login_response.status_code == 200
+        assert me_response.status_code == 200
+        assert me_response.json()["email"] == user_data["email"]
+
+    def test_changes_are_rolled_back_between_tests(self, client: TestClient):
+        # Act
+        response = client.post("/auth/login", json={"email": "flow@example.com", "password": "securepassword123"})
+
+        # Assert
+        assert response.status_code == 401
+
+
+@pytest.mark.usefixtures("client", "db_session")
+class TestTokenRevocation:
+
+    USER_DATA = {"email": "revoked@example.com", "password": "securepassword123", "full_name": "Revoked User"}
+
+    def _login(self, client: TestClient) -> dict:
+        client.post("/auth/register", json=self.USER_DATA)
+        return client.post("/auth/login", json=self.USER_DATA).json()
+
+    @pytest.mark.usefixtures("as_service")
+    @pytest.mark.parametrize("stateless", [False, True])
+    def test_tokens_of_deleted_account_stay_revoked_after_reregistration(self, client: TestClient, stateless: bool):
+        # Arrange
+        old_tokens = self._login(client)
+        old_headers = {"Authorization": f"Bearer {old_tokens['access_token']}"}
+        client.delete("/users/me", headers=old_headers)
+        client.post("/auth/register", json=self.USER_DATA)
+
+        with patch.object(dependencies.jwt_settings, "stateless_auth", stateless):
+            # Act
+            me = client.get("/users/me", headers=old_headers)
+            introspection = client.post("/auth/introspect", json={"tokens": [old_tokens["access_token"]]})
+            refreshed = client.post("/auth/refresh", json={"refresh_token": old_tokens["refresh_token"]})
+
+        # Assert
+        assert me.status_code == 401
+        assert introspection.json()["results"][0]["active"] is False
+        assert refreshed.status_code == 401
+
+    def test_refresh_rejected_after_password_change(self, client: TestClient):
+        # Arrange
+        old_tokens = self._login(client)
+        client.patch("/users/me", json={"password": "newpassword123"}, headers={"Authorization": f"Bearer {old_tokens['access_token']}"})
+
+        # Act
+        response = client.post("/auth/refresh", json={"refresh_token": old_tokens["refresh_token"]})
+
+        # Assert
+        assert response.status_code == 401
+
+    def test_role_change_revokes_tokens_carrying_old_role(self, client: TestClient, db_session):
+        # Arrange
+        old_tokens = self._login(client)
+        user = db_session.query(User).filter(User.email == self.USER_DATA["email"]).first()
+        user.role = "admin"
+        db_session.commit()
+
+        # Act
+        response = client.post("/auth/refresh", json={"refresh_token": old_tokens["refresh_token"]})
+
+        # Assert
+        assert response.status_code == 401
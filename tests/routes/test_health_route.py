@@ -0,0 +1,38 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+@pytest.mark.usefixtures("client")
+class TestHealthRoute:
+
+    def test_liveness_success(self, client: TestClient):
+        # Act
+        response = client.get("/healthz")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
+
+    def test_readiness_ready(self, client: TestClient):
+        # Arrange
+        report = {"ready": True, "checks": {"database": {"ok": True}}}
+
+        # Act
+        with patch("app.routes.health_route.readiness_probe.check", return_value=report):
+            response = client.get("/readyz")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready", "checks": report["checks"]}
+
+    def test_readiness_not_ready(self, client: TestClient):
+        # Arrange
+        report = {"ready": False, "checks": {"database": {"ok": False, "detail": "OperationalError"}}}
+
+        # Act
+        with patch("app.routes.health_route.readiness_probe.check", return_value=report):
+            response = client.get("/readyz")
+
+        # Assert
+        assert response.status_code == 503
+        assert response.json()["status"] == "not_ready"
@@ -1,6 +1,10 @@
 import pytest
+from datetime import datetime, timezone
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock, ANY
+from app.core.dependencies import require_permissions
+from app.core.permissions import Permission
+from app.models.user_model import User
 from app.routes import user_route
 
 @pytest.mark.usefixtures("client")
@@ -30,6 +34,23 @@ class TestUserRoute:
 
         client.app.dependency_overrides.clear()
 
+    def test_read_current_user_reuses_loaded_user(self, client: TestClient):
+        # Arrange
+        current_user = User(id=1, email="testuser@example.com", full_name="Test User",
+                            created_at=datetime(2025, 11, 7, 21, 45, tzinfo=timezone.utc))
+        client.app.dependency_overrides[user_route.get_current_user] = lambda: current_user
+
+        with patch("app.services.user_service.get_user_by_email") as mock_get_user:
+            # Act
+            response = client.get("/users/me")
+
+            # Assert
+            assert response.status_code == 200
+            assert response.json()["full_name"] == "Test User"
+            mock_get_user.assert_not_called()
+
+        client.app.dependency_overrides.clear()
+
     def test_list_users_success_admin(self, client: TestClient):
         # Arrange
         mock_admin = MagicMock()
@@ -41,7 +62,7 @@ class TestUserRoute:
             {"id": 2, "email": "user2@example.com", "full_name": "User Two", "created_at": "2025-11-07T21:46:00Z"}
         ]
 
-        client.app.dependency_overrides[user_route.get_admin_user] = lambda: mock_admin
+        client.app.dependency_overrides[require_permissions(Permission.USERS_READ)] = lambda: mock_admin
 
         with patch("app.services.user_service.list_all_users", return_value=expected_users):
             # Act
@@ -53,6 +74,22 @@ class TestUserRoute:
 
         client.app.dependency_overrides.clear()
 
+    def test_user_events_requires_admin(self, client: TestClient):
+        # Arrange
+        mock_user = MagicMock()
+        mock_user.role = "user"
+        mock_user.permissions = Permission.NONE
+
+        client.app.dependency_overrides[user_route.get_current_user] = lambda: mock_user
+
+        # Act
+        response = client.get("/users/events")
+
+        # Assert
+        assert response.status_code == 403
+
+        client.app.dependency_overrides.clear()
+
     def test_update_current_user_success(self, client: TestClient):
         # Arrange
         mock_user = MagicMock()
@@ -83,6 +120,46 @@ class TestUserRoute:
 
         client.app.dependency_overrides.clear()
 
+    def test_patch_current_user_sends_only_given_fields(self, client: TestClient):
+        # Arrange
+        mock_user = MagicMock()
+        mock_user.email = "testuser@example.com"
+
+        expected_response = {
+            "id": 1,
+            "email": "testuser@example.com",
+            "full_name": "New Name",
+            "created_at": "2025-11-07T21:45:00Z"
+        }
+
+        client.app.dependency_overrides[user_route.get_current_user] = lambda: mock_user
+
+        with patch("app.services.user_service.update_user", return_value=expected_response) as mock_update:
+            # Act
+            response = client.patch("/users/me", json={"full_name": "New Name"})
+
+            # Assert
+            assert response.status_code == 200
+            assert response.json() == expected_response
+            mock_update.assert_called_once_with(db=ANY, current_user=mock_user, full_name="New Name")
+
+        client.app.dependency_overrides.clear()
+
+    @pytest.mark.parametrize("body", [{"full_name": ""}, {"full_name": None}, {"password": ""}, {"password": None}])
+    def test_patch_current_user_rejects_null_or_empty_fields(self, client: TestClient, body: dict):
+        # Arrange
+        client.app.dependency_overrides[user_route.get_current_user] = lambda: MagicMock()
+
+        with patch("app.services.user_service.update_user") as mock_update:
+            # Act
+            response = client.patch("/users/me", json=body)
+
+            # Assert
+            assert response.status_code == 422
+            mock_update.assert_not_called()
+
+        client.app.dependency_overrides.clear()
+
     def test_delete_current_user_success(self, client: TestClient):
         # Arrange
         mock_user = MagicMock()
@@ -100,3 +177,36 @@ class TestUserRoute:
             mock_delete.assert_called_once_with(db=ANY, user=mock_user)
 
         client.app.dependency_overrides.clear()
+
+
+@pytest.mark.usefixtures("client", "db_session")
+class TestUserChangeFeed:
+
+    def _login(self, client: TestClient, email: str) -> dict:
+        user_data = {"email": email, "password": "securepassword123", "full_name": "Feed User"}
+        client.post("/auth/register", json=user_data)
+        access_token = client.post("/auth/login", json=user_data).json()["access_token"]
+        return {"Authorization": f"Bearer {access_token}"}
+
+    def test_changes_are_paginated_and_resumable(self, client: TestClient):
+        # Arrange
+        kept_headers = self._login(client, "kept@example.com")
+        deleted_headers = self._login(client, "deleted@example.com")
+        client.patch("/users/me", json={"full_name": "Renamed"}, headers=kept_headers)
+        client.delete("/users/me", headers=deleted_headers)
+        client.app.dependency_overrides[require_permissions(Permission.USERS_AUDIT)] = lambda: MagicMock(role="admin")
+
+        # Act
+        first_page = client.get("/users/changes", params={"since": 0, "limit": 3}).json()
+        second_page = client.get("/users/changes", params={"since": first_page["next_cursor"]}).json()
+
+        # Assert
+        assert [change["op"] for change in first_page["changes"]] == ["created", "created", "updated"]
+        assert first_page["has_more"] is True
+        assert first_page["changes"][2]["user"]["full_name"] == "Renamed"
+        assert first_page["changes"][1]["user"] is None
+        assert [change["op"] for change in second_page["changes"]] == ["deleted"]
+        assert second_page["changes"][0]["email"] == "deleted@example.com"
+        assert second_page["has_more"] is False
+
+        client.app.dependency_overrides.pop(require_permissions(Permission.USERS_AUDIT), None)
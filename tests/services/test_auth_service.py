@@ -1,5 +1,6 @@
 import pytest
 from unittest.mock import MagicMock, patch
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from app.services import auth_service
@@ -12,35 +13,61 @@ class TestAuthService:
     def test_register_user_success(self):
         # Arrange
         mock_db = MagicMock(spec=Session)
-        mock_db.query().filter().first.return_value = None  # No existing user
         user_create = UserCreate(email="test@example.com", password="secret", full_name="Test User")
         hashed_password = "hashed_secret"
+        inserted_user = User(id=1, email=user_create.email, full_name=user_create.full_name, hashed_password=hashed_password)
+        mock_db.scalars().first.return_value = inserted_user
 
         with patch("app.services.auth_service.get_password_hash", return_value=hashed_password):
             # Act
             new_user = auth_service.register_user(mock_db, user_create)
 
         # Assert
-        mock_db.add.assert_called_once()
+        mock_db.query.assert_not_called()
         mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once_with(new_user)
-        assert new_user.email == user_create.email
-        assert new_user.full_name == user_create.full_name
-        assert new_user.hashed_password == hashed_password
+        mock_db.refresh.assert_not_called()
+        assert new_user is inserted_user
 
-    def test_register_user_existing_email_raises(self):
+    def test_register_user_publishes_event(self):
         # Arrange
         mock_db = MagicMock(spec=Session)
-        existing_user = User(email="test@example.com")
-        mock_db.query().filter().first.return_value = existing_user
         user_create = UserCreate(email="test@example.com", password="secret", full_name="Test User")
+        mock_db.scalars().first.return_value = User(id=1, email=user_create.email, full_name=user_create.full_name)
 
-        # Act & Assert
-        with pytest.raises(HTTPException) as exc:
+        with patch("app.services.auth_service.get_password_hash", return_value="hashed_secret"), \
+             patch("app.services.auth_service.event_bus.publish") as mock_publish:
+            # Act
             auth_service.register_user(mock_db, user_create)
+
+        # Assert
+        mock_publish.assert_called_once_with("user.registered", {"id": 1, "email": "test@example.com", "full_name": "Test User"})
+
+    def test_register_user_existing_email_raises(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+        mock_db.scalars().first.return_value = None  # ON CONFLICT DO NOTHING returned no row
+        user_create = UserCreate(email="test@example.com", password="secret", full_name="Test User")
+
+        with patch("app.services.auth_service.get_password_hash", return_value="hashed_secret"):
+            # Act & Assert
+            with pytest.raises(HTTPException) as exc:
+                auth_service.register_user(mock_db, user_create)
         assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
         assert exc.value.detail == "Email already registered"
 
+    def test_register_user_integrity_error_raises(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+        mock_db.scalars.side_effect = IntegrityError("INSERT", {}, Exception("duplicate key"))
+        user_create = UserCreate(email="test@example.com", password="secret", full_name="Test User")
+
+        with patch("app.services.auth_service.get_password_hash", return_value="hashed_secret"):
+            # Act & Assert
+            with pytest.raises(HTTPException) as exc:
+                auth_service.register_user(mock_db, user_create)
+        assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+        mock_db.rollback.assert_called_once()
+
     def test_login_user_success(self):
         # Arrange
         mock_db = MagicMock(spec=Session)
@@ -76,30 +103,104 @@ class TestAuthService:
 
     def test_refresh_tokens_success(self):
         # Arrange
+        mock_db = MagicMock(spec=Session)
+        mock_db.query().filter().first.return_value = User(id=7, email="test@example.com", full_name="Renamed", role="user", token_version=3)
         refresh_token_value = "refresh123"
-        payload = {"sub": "test@example.com"}
+        payload = {"sub": "test@example.com", "uid": 7, "role": "admin", "name": "Test User", "ver": 3}
         new_access_token = "new_access"
         new_refresh_token = "new_refresh"
 
         with patch("app.services.auth_service.verify_token", return_value=payload), \
-             patch("app.services.auth_service.create_access_token", return_value=new_access_token), \
+             patch("app.services.auth_service.create_access_token", return_value=new_access_token) as mock_access, \
              patch("app.services.auth_service.create_refresh_token", return_value=new_refresh_token):
             # Act
-            token = auth_service.refresh_tokens(refresh_token_value)
+            token = auth_service.refresh_tokens(mock_db, refresh_token_value)
 
         # Assert
         assert isinstance(token, Token)
         assert token.access_token == new_access_token
         assert token.refresh_token == new_refresh_token
         assert token.token_type == "bearer"
+        # Claims come from the current row, not from the old token
+        mock_access.assert_called_once_with(data={"sub": "test@example.com", "uid": 7, "role": "user", "name": "Renamed", "ver": 3})
 
     def test_refresh_tokens_invalid_raises(self):
         # Arrange
+        mock_db = MagicMock(spec=Session)
         refresh_token_value = "invalid_refresh"
 
         with patch("app.services.auth_service.verify_token", return_value=None):
             # Act & Assert
             with pytest.raises(HTTPException) as exc:
-                auth_service.refresh_tokens(refresh_token_value)
+                auth_service.refresh_tokens(mock_db, refresh_token_value)
             assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
             assert exc.value.detail == "Invalid refresh token"
+
+    @pytest.mark.parametrize("user_in_db", [
+        None,
+        User(id=7, email="test@example.com", role="user", token_version=4),
+        User(id=8, email="test@example.com", role="user", token_version=3),
+    ], ids=["deleted", "revoked", "re-registered"])
+    def test_refresh_tokens_of_stale_user_raises(self, user_in_db):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+        mock_db.query().filter().first.return_value = user_in_db
+        payload = {"sub": "test@example.com", "uid": 7, "role": "user", "ver": 3}
+
+        with patch("app.services.auth_service.verify_token", return_value=payload):
+            # Act & Assert
+            with pytest.raises(HTTPException) as exc:
+                auth_service.refresh_tokens(mock_db, "refresh123")
+            assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_introspect_tokens_checks_users_in_one_query(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+        mock_db.query().filter().all.return_value = [("test@example.com", 7, 2)]
+        mock_db.query.reset_mock()
+        payloads = {
+            "valid": {"sub": "test@example.com", "exp": 1762555500, "uid": 7, "ver": 2},
+            "deleted_user": {"sub": "gone@example.com", "exp": 1762555500},
+            "invalid": None,
+            "revoked": {"sub": "test@example.com", "exp": 1762555500, "ver": 1},
+            "previous_account": {"sub": "test@example.com", "exp": 1762555500, "uid": 5, "ver": 2},
+        }
+
+        with patch("app.services.auth_service.verify_token", side_effect=payloads.get):
+            # Act
+            response = auth_service.introspect_tokens(mock_db, ["valid", "deleted_user", "invalid", "revoked", "valid", "previous_account"])
+
+        # Assert
+        assert [result.active for result in response.results] == [True, False, False, False, True, False]
+        assert response.results[0].sub == "test@example.com"
+        assert response.results[0].exp == 1762555500
+        assert response.results[1].sub is None
+        mock_db.query.assert_called_once()
+
+    def test_introspect_tokens_all_invalid_skips_query(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+
+        with patch("app.services.auth_service.verify_token", return_value=None):
+            # Act
+            response = auth_service.introspect_tokens(mock_db, ["invalid"])
+
+        # Assert
+        assert response.results[0].active is False
+        mock_db.query.assert_not_called()
+
+    def test_login_user_embeds_user_claims(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+        user_in_db = User(id=7, email="test@example.com", hashed_password="hashed_secret", full_name="Test User", role="admin", token_version=3)
+        mock_db.query().filter().first.return_value = user_in_db
+        user_create = UserCreate(email="test@example.com", password="secret")
+
+        with patch("app.services.auth_service.verify_password", return_value=True), \
+             patch("app.services.auth_service.create_access_token", return_value="access123") as mock_access, \
+             patch("app.services.auth_service.create_refresh_token", return_value="refresh123"):
+            # Act
+            auth_service.login_user(mock_db, user_create)
+
+        # Assert
+        mock_access.assert_called_once_with(data={"sub": "test@example.com", "uid": 7, "role": "admin", "name": "Test User", "ver": 3})
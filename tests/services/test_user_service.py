@@ -1,11 +1,34 @@
+import os
+import threading
+import time
 import pytest
+from datetime import datetime, timezone
 from unittest.mock import MagicMock, patch
 from fastapi import HTTPException, status
+from app.core.database import Base, make_engine
 from app.services import user_service
 from app.models.user_model import User
+from app.models.user_change_model import UserChange
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
 
+# PostgreSQL is only tested when TEST_POSTGRES_URL points to a scratch database
+@pytest.fixture(params=["sqlite", "postgresql"])
+def change_log_engine(request, tmp_path):
+    if request.param == "postgresql":
+        if not os.environ.get("TEST_POSTGRES_URL"):
+            pytest.skip("TEST_POSTGRES_URL is not set")
+        engine = make_engine(os.environ["TEST_POSTGRES_URL"])
+    else:
+        engine = make_engine(f"sqlite:///{tmp_path}/changes.db")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(delete(UserChange))
+    yield engine
+    engine.dispose()
+
+
 @pytest.mark.unit
 class TestUserService:
 
@@ -36,10 +59,11 @@ class TestUserService:
     def test_update_user_success(self):
         # Arrange
         mock_db = MagicMock(spec=Session)
-        user_in_db = User(email="test@example.com", full_name="Old Name", hashed_password="hashed_secret")
-        mock_db.query().filter().first.return_value = user_in_db
+        user_in_db = User(id=1, email="test@example.com", full_name="Old Name", hashed_password="hashed_secret")
         updated_full_name = "New Name"
         updated_password = "newpassword"
+        returned_user = User(id=1, email="test@example.com", full_name=updated_full_name, hashed_password="new_hashed_password")
+        mock_db.scalars().first.return_value = returned_user
 
         with patch("app.services.user_service.get_password_hash", return_value="new_hashed_password"):
             # Act
@@ -48,29 +72,81 @@ class TestUserService:
         # Assert
         assert updated_user.full_name == updated_full_name
         assert updated_user.hashed_password == "new_hashed_password"
-        mock_db.add.assert_called_once()
+        mock_db.add.assert_called_once()  # only the change log entry, the user itself is not re-added
+        assert isinstance(mock_db.add.call_args.args[0], UserChange)
+        mock_db.refresh.assert_not_called()
+        mock_db.commit.assert_called_once()
+
+    def test_update_user_sends_only_changed_columns(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+        user_in_db = User(id=1, email="test@example.com", full_name="Old Name", hashed_password="hashed_secret")
+
+        # Act
+        user_service.update_user(mock_db, user_in_db, full_name="New Name")
+
+        # Assert
+        statement = mock_db.scalars.call_args.args[0]
+        assert set(statement.compile().params) == {"full_name", "id_1"}
+
+    def test_update_user_writes_empty_full_name(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+        user_in_db = User(id=1, email="test@example.com", full_name="Old Name", hashed_password="hashed_secret")
+
+        # Act
+        user_service.update_user(mock_db, user_in_db, full_name="")
+
+        # Assert
+        statement = mock_db.scalars.call_args.args[0]
+        assert statement.compile().params["full_name"] == ""
         mock_db.commit.assert_called_once()
 
+    def test_record_change_serializes_commits_on_postgresql(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+
+        with patch("app.services.user_service._SERIALIZE_CHANGE_LOG", True):
+            # Act
+            user_service.record_change(mock_db, 1, "test@example.com", "updated")
+
+        # Assert
+        statement = mock_db.execute.call_args.args[0]
+        assert "pg_advisory_xact_lock" in str(statement)
+        assert mock_db.method_calls[0][0] == "execute"  # the lock is taken before the entry is added
+        assert isinstance(mock_db.add.call_args.args[0], UserChange)
+
+    def test_update_user_without_changes_skips_write(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+        user_in_db = User(id=1, email="test@example.com", full_name="Old Name", hashed_password="hashed_secret")
+        mock_db.get.return_value = user_in_db
+
+        # Act
+        updated_user = user_service.update_user(mock_db, user_in_db)
+
+        # Assert
+        assert updated_user is user_in_db
+        mock_db.commit.assert_not_called()
+
     def test_delete_user_success(self):
         # Arrange
         mock_db = MagicMock(spec=Session)
-        user_in_db = User(email="test@example.com", full_name="Test User", hashed_password="hashed_secret")
-        mock_db.query().filter().first.return_value = user_in_db
+        user_in_db = User(id=1, email="test@example.com", full_name="Test User", hashed_password="hashed_secret")
 
         # Act
         result = user_service.delete_user(mock_db, user_in_db)
 
         # Assert
         assert result is True
-        mock_db.delete.assert_called_once()
+        mock_db.execute.assert_called_once()
         mock_db.commit.assert_called_once()
 
     def test_delete_user_failure(self):
         # Arrange
         mock_db = MagicMock(spec=Session)
-        user_in_db = User(email="test@example.com", full_name="Test User", hashed_password="hashed_secret")
-        mock_db.query().filter().first.return_value = user_in_db
-        mock_db.delete.side_effect = Exception("DB error")
+        user_in_db = User(id=1, email="test@example.com", full_name="Test User", hashed_password="hashed_secret")
+        mock_db.execute.side_effect = Exception("DB error")
 
         # Act
         result = user_service.delete_user(mock_db, user_in_db)
@@ -149,3 +225,129 @@ class TestUserService:
         assert users[1].email == "user2@example.com"
         mock_db.query().all.assert_called_once()
 
+
+    def test_update_user_password_bumps_token_version(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+        user_in_db = User(id=1, email="test@example.com", hashed_password="hashed_secret", token_version=1)
+
+        with patch("app.services.user_service.get_password_hash", return_value="new_hashed_password"), \
+             patch("app.services.user_service.token_versions.invalidate") as mock_invalidate:
+            # Act
+            user_service.update_user(mock_db, user_in_db, password="newpassword")
+
+        # Assert
+        statement = mock_db.scalars.call_args.args[0]
+        assert "token_version=(users.token_version +" in str(statement)
+        mock_invalidate.assert_called_once_with("test@example.com")
+
+    def test_delete_user_publishes_event(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+        user_in_db = User(id=1, email="test@example.com", full_name="Test User", hashed_password="hashed_secret")
+
+        with patch("app.services.user_service.event_bus.publish") as mock_publish:
+            # Act
+            user_service.delete_user(mock_db, user_in_db)
+
+        # Assert
+        mock_publish.assert_called_once_with("user.deleted", {"id": 1, "email": "test@example.com"})
+
+    def test_update_user_publishes_changed_fields(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+        user_in_db = User(id=1, email="test@example.com", full_name="New Name", hashed_password="hashed_secret")
+        mock_db.scalars().first.return_value = user_in_db
+
+        with patch("app.services.user_service.event_bus.publish") as mock_publish:
+            # Act
+            user_service.update_user(mock_db, user_in_db, full_name="New Name")
+
+        # Assert
+        event_type, data = mock_publish.call_args.args
+        assert event_type == "user.updated"
+        assert data["fields"] == ["full_name"]
+
+    def test_list_user_changes_returns_page_and_cursor(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+        changed_at = datetime(2025, 11, 7, 21, 45, tzinfo=timezone.utc)
+        rows = [
+            (UserChange(id=5, user_id=1, email="a@example.com", op="created", changed_at=changed_at),
+             User(id=1, email="a@example.com", full_name="A", created_at=changed_at)),
+            (UserChange(id=6, user_id=2, email="b@example.com", op="deleted", changed_at=changed_at), None),
+            (UserChange(id=7, user_id=3, email="c@example.com", op="created", changed_at=changed_at), None),
+        ]
+        mock_db.query().outerjoin().filter().order_by().limit().all.return_value = rows
+
+        # Act
+        page = user_service.list_user_changes(mock_db, since="4", limit=2)
+
+        # Assert
+        assert [change.cursor for change in page.changes] == ["5", "6"]
+        assert page.changes[0].user.email == "a@example.com"
+        assert page.changes[1].user is None
+        assert page.next_cursor == "6"
+        assert page.has_more is True
+
+    def test_delete_user_records_tombstone(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+        mock_db.execute.return_value.rowcount = 1
+        user_in_db = User(id=1, email="test@example.com", full_name="Test User", hashed_password="hashed_secret")
+
+        # Act
+        user_service.delete_user(mock_db, user_in_db)
+
+        # Assert
+        change = mock_db.add.call_args.args[0]
+        assert (change.user_id, change.email, change.op) == (1, "test@example.com", "deleted")
+
+    def test_list_user_changes_invalid_cursor_raises(self):
+        # Arrange
+        mock_db = MagicMock(spec=Session)
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc:
+            user_service.list_user_changes(mock_db, since="4.x")
+        assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+        assert exc.value.detail == "Invalid cursor"
+
+
+@pytest.mark.unit
+class TestChangeLogOrdering:
+
+    def test_change_log_ids_commit_in_ascending_order(self, change_log_engine):
+        # Arrange
+        first_flushed = threading.Event()
+        ids = {}
+
+        def slow_writer():
+            with Session(change_log_engine) as db:
+                user_service.record_change(db, 1, "slow@example.com", "updated")
+                db.flush()  # the entry gets the lower ID ...
+                ids["slow"] = db.scalars(select(UserChange.id).where(UserChange.email == "slow@example.com")).one()
+                first_flushed.set()
+                time.sleep(0.3)  # ... but would commit after the fast writer without the lock
+                db.commit()
+
+        def fast_writer():
+            first_flushed.wait()
+            with Session(change_log_engine) as db:
+                user_service.record_change(db, 2, "fast@example.com", "updated")
+                db.commit()
+            # What a feed reader polling right after this commit would see
+            with Session(change_log_engine) as reader:
+                ids["visible"] = reader.scalars(select(UserChange.id).order_by(UserChange.id)).all()
+
+        # Act
+        with patch("app.services.user_service._SERIALIZE_CHANGE_LOG", change_log_engine.dialect.name == "postgresql"):
+            threads = [threading.Thread(target=slow_writer), threading.Thread(target=fast_writer)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # Assert
+        assert ids["visible"][0] == ids["slow"]
+        assert len(ids["visible"]) == 2 and ids["visible"][1] > ids["slow"]